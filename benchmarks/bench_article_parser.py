@@ -0,0 +1,175 @@
+import argparse
+import glob
+import html as html_module
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcnews.fetcher import MCNewsFetcher
+from mcnews.models import MCVersionContent
+
+
+def legacy_clean_text(text: str) -> str:
+    text = re.sub(r'<[^>]+>', '', text).strip()
+    text = re.sub(r'\s+', ' ', text)
+    text = html_module.unescape(text)
+    return text
+
+
+def legacy_parse_article_html(html_content: str) -> MCVersionContent:
+    content = MCVersionContent()
+
+    features_match = re.search(
+        r'<h2[^>]*>New Features</h2>(.*?)(?=<h2)',
+        html_content, re.DOTALL
+    )
+    if features_match:
+        items = re.findall(r'<li[^>]*>(.*?)</li>', features_match.group(1), re.DOTALL)
+        for item in items[:10]:
+            text = legacy_clean_text(item)
+            if text and len(text) > 3:
+                content.new_features.append(text)
+
+    changes_match = re.search(
+        r'<h2[^>]*>Changes</h2>(.*?)(?=<h2)',
+        html_content, re.DOTALL
+    )
+    if changes_match:
+        items = re.findall(r'<li[^>]*>(.*?)</li>', changes_match.group(1), re.DOTALL)
+        for item in items[:10]:
+            text = legacy_clean_text(item)
+            if text and len(text) > 3:
+                content.changes.append(text)
+
+    bugs_match = re.search(
+        r'<h2[^>]*>Fixed bugs[^<]*</h2>(.*?)(?=<h2)',
+        html_content, re.DOTALL | re.IGNORECASE
+    )
+    if bugs_match:
+        items = re.findall(r'<li[^>]*>(.*?)</li>', bugs_match.group(1), re.DOTALL)
+        for item in items[:15]:
+            text = legacy_clean_text(item)
+            mc_match = re.search(r'(MC-\d+)', text)
+            if mc_match:
+                bug_id = mc_match.group(1)
+                desc = text.split(' - ', 1)[-1] if ' - ' in text else text
+                content.bug_fixes.append(f"{bug_id}: {desc}")
+            elif text and len(text) > 3:
+                content.bug_fixes.append(text)
+
+    tech_match = re.search(
+        r'<h2[^>]*>Technical Changes</h2>(.*?)(?=<h2)',
+        html_content, re.DOTALL
+    )
+    if tech_match:
+        items = re.findall(r'<li[^>]*>(.*?)</li>', tech_match.group(1), re.DOTALL)
+        for item in items[:5]:
+            text = legacy_clean_text(item)
+            if text and len(text) > 3:
+                content.technical_changes.append(text)
+
+    return content
+
+
+def synthetic_article(items: int = 400) -> str:
+    parts = ["<html><body><div class='article'>", "<p>" + "Lorem ipsum " * 500 + "</p>"]
+    for heading in ("New Features", "Changes", "Technical Changes", "Fixed bugs in 24w01a"):
+        parts.append(f"<h2 class='heading'>{heading}</h2><ul>")
+        for i in range(items):
+            if heading.startswith("Fixed"):
+                parts.append(f"<li><a href='https://bugs.mojang.com/MC-{i}'>MC-{i}</a> - Bug &amp; {i}</li>")
+            else:
+                parts.append(f"<li>  <b>{heading}</b> item {i} &quot;text&quot;\n</li>")
+        parts.append("</ul>")
+    parts.append("<h2>Get the Snapshot</h2></div></body></html>")
+    return "".join(parts)
+
+
+def synthetic_patch_notes(items: int = 60) -> str:
+    # Laid out like a launcher patch notes body: <h1> sections with <h2>
+    # sub-headings, ending with the bug list and nothing after it.
+    parts = ["<p>" + "Lorem ipsum " * 100 + "</p>"]
+    for heading in ("New Features", "Changes", "Technical Changes"):
+        parts.append(f"<h1>{heading}</h1>")
+        for group in range(2):
+            parts.append(f"<h2>{heading} group {group}</h2><ul>")
+            for i in range(items // 2):
+                parts.append(f"<li>{heading} item {group}.{i} &quot;text&quot;</li>")
+            parts.append("</ul>")
+    parts.append("<h1>Fixed bugs in 24w10a</h1><ul>")
+    for i in range(items):
+        parts.append(f"<li><a href='https://bugs.mojang.com/browse/MC-{i}'>MC-{i}</a> - Bug &amp; {i}</li>")
+    parts.append("</ul>")
+    return "".join(parts)
+
+
+def load_articles(directory: str):
+    articles = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            articles.append((os.path.basename(path), f.read()))
+    return articles
+
+
+def load_patch_notes(directory: str):
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(directory, "patch_notes_*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            bodies.append((os.path.basename(path), json.load(f).get("body", "")))
+    return bodies
+
+
+def check_patch_notes(bodies) -> bool:
+    ok = True
+    for name, body in bodies:
+        content = MCNewsFetcher._parse_article_html(body)
+        counts = {section: len(getattr(content, section)) for section in vars(content)}
+        print(f"{name}: {counts}")
+        if "Fixed bugs" in body and not content.bug_fixes:
+            print(f"Missing bug fixes: {name}")
+            ok = False
+    return ok
+
+
+def measure(func, articles, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for _, html_content in articles:
+            func(html_content)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Article parser throughput")
+    parser.add_argument("directory", nargs="?", help="Directory of saved article .html files")
+    parser.add_argument("--patch-notes", metavar="DIR", help="Replay fixture directory with recorded patch notes bodies")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    bodies = load_patch_notes(args.patch_notes) if args.patch_notes else [("synthetic", synthetic_patch_notes())]
+    if not check_patch_notes(bodies):
+        sys.exit(1)
+
+    articles = load_articles(args.directory) if args.directory else [("synthetic", synthetic_article())]
+    if not articles:
+        print("No .html files found")
+        return
+
+    for name, html_content in articles:
+        if legacy_parse_article_html(html_content) != MCNewsFetcher._parse_article_html(html_content):
+            print(f"Output mismatch: {name}")
+            sys.exit(1)
+
+    total_bytes = sum(len(html_content) for _, html_content in articles) * args.rounds
+    print(f"{len(articles)} articles, identical output")
+    for name, func in (("legacy", legacy_parse_article_html), ("single-pass", MCNewsFetcher._parse_article_html)):
+        elapsed = measure(func, articles, args.rounds)
+        print(f"{name:>12}: {total_bytes / elapsed / 1024 / 1024:8.2f} MiB/s  {elapsed * 1000 / args.rounds:8.3f} ms/round")
+
+
+if __name__ == "__main__":
+    main()
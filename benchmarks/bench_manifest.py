@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcnews.manifest import ManifestHeadParser
+from mcnews.constants import MANIFEST_HEAD_SIZE, MANIFEST_CHUNK_SIZE
+
+
+def synthetic_manifest(count: int = 900) -> bytes:
+    versions = []
+    for i in range(count):
+        versions.append({
+            "id": f"1.{count - i}" if i % 10 == 0 else f"24w{i:02d}a",
+            "type": "release" if i % 10 == 0 else "snapshot",
+            "url": f"https://piston-meta.mojang.com/v1/packages/{'0' * 40}/{i}.json",
+            "time": "2024-01-01T00:00:00+00:00",
+            "releaseTime": "2024-01-01T00:00:00+00:00",
+            "sha1": "0" * 40,
+            "complianceLevel": 1
+        })
+    latest = {"release": versions[0]["id"], "snapshot": versions[1]["id"]}
+    return json.dumps({"latest": latest, "versions": versions}, indent=2).encode("utf-8")
+
+
+def full_load(raw: bytes):
+    return json.loads(raw)
+
+
+def head_load(raw: bytes):
+    parser = ManifestHeadParser(MANIFEST_HEAD_SIZE)
+    for i in range(0, len(raw), MANIFEST_CHUNK_SIZE):
+        if parser.feed(raw[i:i + MANIFEST_CHUNK_SIZE]):
+            break
+    parser.close()
+    return parser.result()
+
+
+def measure(func, raw: bytes, rounds: int):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(raw)
+    elapsed = (time.perf_counter() - start) / rounds
+
+    tracemalloc.start()
+    func(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs head-only manifest parsing")
+    parser.add_argument("manifest", nargs="?", help="Recorded version_manifest_v2.json")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.manifest:
+        with open(args.manifest, "rb") as f:
+            raw = f.read()
+    else:
+        raw = synthetic_manifest()
+
+    full = full_load(raw)
+    head = head_load(raw)
+    assert head["latest"] == full["latest"]
+    assert head["versions"] == full["versions"][:len(head["versions"])]
+
+    print(f"manifest: {len(raw)} bytes, {len(full['versions'])} versions")
+    for name, func in (("json.loads", full_load), ("head-only", head_load)):
+        elapsed, peak = measure(func, raw, args.rounds)
+        print(f"{name:>10}: {elapsed * 1000:8.3f} ms/parse  peak {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcnews.fetcher import MCNewsFetcher
+from mcnews.registry import ServiceRegistry
+
+from slp_stub import StubSLPServer
+
+
+async def run(args):
+    server = StubSLPServer(delay=args.delay)
+    port = await server.start()
+    registry = ServiceRegistry({
+        "monitor_mojang_services": False,
+        "custom_services": [f"stub-{i}|mc://127.0.0.1:{port}" for i in range(args.targets)]
+    })
+    services = registry.services()
+    fetcher = MCNewsFetcher()
+    await fetcher.start()
+
+    print(f"{len(services)} SLP targets, server delay {args.delay * 1000:.0f}ms")
+    try:
+        for concurrency, stagger in ((len(services), 0.0), (args.concurrency, 0.0), (args.concurrency, args.stagger)):
+            server.peak = 0
+            start = time.perf_counter()
+            results = await fetcher.fetch_all_services_status(services, concurrency, stagger)
+            elapsed = time.perf_counter() - start
+            online = sum(result.online for result in results)
+            latencies = sorted(result.latency for result in results if result.online)
+            p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+            print(
+                f"concurrency {concurrency:>4} stagger {stagger:>4.1f}s: "
+                f"{elapsed:6.2f}s cycle, {online}/{len(results)} online, "
+                f"peak {server.peak} connections, p95 {p95}ms"
+            )
+    finally:
+        await fetcher.close()
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe cycle against a local stub SLP server")
+    parser.add_argument("--targets", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--stagger", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
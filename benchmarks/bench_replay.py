@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+sys.path.insert(0, ROOT)
+
+from replay_server import ReplayServer, Faults, synthetic_fixtures, load_fixtures, record_fixtures, route_key
+from mcnews.constants import MOJANG_SERVICES
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+METRICS = ("cycle_ms", "settle_ms", "requests", "bytes", "sends", "alloc_kib", "peak_kib")
+
+
+class BenchConfig(dict):
+
+    def save_config(self):
+        pass
+
+
+class FakeContext:
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = 0
+
+    async def send_message(self, session: str, chain: Any):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent += 1
+
+
+class ReplaySession:
+
+    def __init__(self, session: Any, base: str):
+        self._session = session
+        self._base = base
+
+    @property
+    def closed(self) -> bool:
+        return self._session.closed
+
+    def _rewrite(self, url: str) -> str:
+        return f"{self._base}/{route_key(str(url))}"
+
+    def get(self, url: str, **kwargs):
+        return self._session.get(self._rewrite(url), **kwargs)
+
+    def request(self, method: str, url: str, **kwargs):
+        return self._session.request(method, self._rewrite(url), **kwargs)
+
+    async def close(self):
+        await self._session.close()
+
+
+async def settle():
+    current = asyncio.current_task()
+    while True:
+        pending = [task for task in asyncio.all_tasks() if task is not current and not task.done()]
+        if not pending:
+            return
+        await asyncio.wait(pending, timeout=30)
+
+
+async def run_scenario(name: str, step: Callable, server: ReplayServer, context: FakeContext, trace: bool) -> Dict[str, float]:
+    before = server.snapshot()
+    sent = context.sent
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    await step()
+    cycle = time.perf_counter() - start
+    await settle()
+    settled = time.perf_counter() - start
+    result = {"cycle_ms": cycle * 1000, "settle_ms": settled * 1000}
+    if trace:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["alloc_kib"] = current / 1024
+        result["peak_kib"] = peak / 1024
+    after = server.snapshot()
+    result["requests"] = after["requests"] - before["requests"]
+    result["bytes"] = after["bytes"] - before["bytes"]
+    result["sends"] = context.sent - sent
+    result["statuses"] = {
+        key[len("status_"):]: after[key] - before.get(key, 0)
+        for key in after if key.startswith("status_") and after[key] != before.get(key, 0)
+    }
+    return result
+
+
+async def run_round(plugin, args, fixtures, trace: bool) -> Dict[str, Dict[str, float]]:
+    faults = Faults(
+        latency=args.latency / 1000,
+        error_rate=args.error_rate,
+        hang=args.hang,
+        no_304=args.no_304
+    )
+    server = ReplayServer(fixtures(), faults)
+    server.start()
+
+    root = tempfile.mkdtemp(prefix="mcnews-bench-")
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+    os.environ["ASTRBOT_ROOT"] = root
+
+    config = BenchConfig(
+        whitelist=[f"bench:GroupMessage:{i}" for i in range(args.sessions)],
+        service_state_threshold=args.threshold,
+        delivery_rate_limit=0
+    )
+    context = FakeContext(args.send_delay / 1000)
+    current = {}
+
+    async def boot():
+        main = plugin.Main(context, config)
+        main.scheduler.pause()
+        await main.fetcher.start()
+        main.fetcher._session = ReplaySession(main.fetcher._session, server.base)
+        current["main"] = main
+
+    async def shutdown():
+        await current.pop("main").terminate()
+
+    def call(name: str) -> Callable:
+        async def step():
+            await getattr(current["main"], name)()
+        return step
+
+    async def versions_new():
+        server.publish_version()
+        await current["main"]._check_versions()
+
+    async def services_outage():
+        faults.fail_paths.add("sessionserver")
+        for _ in range(args.threshold):
+            await current["main"]._check_service_status()
+
+    async def services_recovery():
+        faults.fail_paths.clear()
+        for _ in range(args.threshold):
+            await current["main"]._check_service_status()
+
+    async def services_mass_outage():
+        faults.fail_paths.update(route_key(service["url"]) for service in MOJANG_SERVICES)
+        for _ in range(args.threshold):
+            await current["main"]._check_service_status()
+
+    async def services_mass_recovery():
+        faults.fail_paths.clear()
+        for _ in range(args.threshold):
+            await current["main"]._check_service_status()
+
+    async def broadcast():
+        await current["main"]._send_to_whitelist("[MCNews benchmark] broadcast")
+
+    if args.hang:
+        faults.hang_paths.add("api.mojang.com")
+
+    scenarios = [
+        ("cold_load", boot),
+        ("versions_cold", call("_check_versions")),
+        ("versions_steady", call("_check_versions")),
+        ("versions_new", versions_new),
+        ("services", call("_init_service_status")),
+        ("services_steady", call("_check_service_status")),
+        ("services_outage", services_outage),
+        ("services_recovery", services_recovery),
+        ("services_mass_outage", services_mass_outage),
+        ("services_mass_recovery", services_mass_recovery),
+        ("broadcast", broadcast),
+        ("shutdown", shutdown),
+        ("warm_load", boot),
+        ("versions_warm", call("_check_versions")),
+        ("services_warm", call("_check_service_status")),
+    ]
+    results = {}
+    try:
+        for name, step in scenarios:
+            results[name] = await run_scenario(name, step, server, context, trace)
+    finally:
+        if "main" in current:
+            await current["main"].terminate()
+        server.stop()
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def parser_throughput(plugin_fetcher, fixtures, rounds: int) -> Dict[str, float]:
+    from mcnews.manifest import ManifestHeadParser
+    from mcnews.constants import MC_VERSION_MANIFEST, MANIFEST_HEAD_SIZE, MANIFEST_CHUNK_SIZE
+
+    results = {}
+    article = fixtures.get("article")
+    if article is not None:
+        html = article.body.decode("utf-8")
+        start = time.perf_counter()
+        for _ in range(rounds):
+            plugin_fetcher._parse_article_full(html)
+        elapsed = time.perf_counter() - start
+        results["article_mib_s"] = len(article.body) * rounds / elapsed / 1024 / 1024
+
+    raw = fixtures[route_key(MC_VERSION_MANIFEST)].body
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parser = ManifestHeadParser(MANIFEST_HEAD_SIZE)
+        for i in range(0, len(raw), MANIFEST_CHUNK_SIZE):
+            if parser.feed(raw[i:i + MANIFEST_CHUNK_SIZE]):
+                break
+        parser.close()
+    elapsed = time.perf_counter() - start
+    results["manifest_head_per_s"] = rounds / elapsed
+    return results
+
+
+def aggregate(rounds: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    for name in rounds[0]:
+        entry = {}
+        for metric in METRICS:
+            values = [round_[name][metric] for round_ in rounds if metric in round_[name]]
+            if values:
+                entry[metric] = statistics.median(values)
+        entry["statuses"] = rounds[-1][name]["statuses"]
+        summary[name] = entry
+    return summary
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_results(results: Dict[str, Any], baseline: Dict[str, Any] = None):
+    header = f"{'scenario':<24}" + "".join(f"{metric:>12}" for metric in METRICS)
+    print(header)
+    for name, entry in results["scenarios"].items():
+        line = f"{name:<24}" + "".join(f"{entry.get(metric, 0):>12.1f}" for metric in METRICS)
+        print(line)
+        old = (baseline or {}).get("scenarios", {}).get(name)
+        if old:
+            deltas = []
+            for metric in METRICS:
+                if old.get(metric):
+                    deltas.append(f"{(entry.get(metric, 0) - old[metric]) / old[metric] * 100:>+11.1f}%")
+                else:
+                    deltas.append(f"{'-':>12}")
+            print(f"{'  vs baseline':<24}" + "".join(deltas))
+    for metric, value in results["parsers"].items():
+        old = (baseline or {}).get("parsers", {}).get(metric)
+        delta = f" ({(value - old) / old * 100:+.1f}%)" if old else ""
+        print(f"{metric}: {value:.2f}{delta}")
+
+
+async def run(args):
+    plugin = importlib.import_module(os.path.basename(ROOT) + ".main")
+    if args.fixtures:
+        fixtures = lambda: load_fixtures(args.fixtures)
+    else:
+        fixtures = lambda: synthetic_fixtures(args.versions)
+
+    rounds = []
+    for i in range(args.rounds):
+        rounds.append(await run_round(plugin, args, fixtures, trace=i == args.rounds - 1))
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "args": vars(args),
+        "scenarios": aggregate(rounds),
+        "parsers": parser_throughput(plugin.MCNewsFetcher, fixtures(), args.parser_rounds),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end replay benchmark against a local Mojang stand-in")
+    parser.add_argument("--fixtures", help="Directory of recorded responses (see --record)")
+    parser.add_argument("--record", metavar="DIR", help="Record live responses into DIR and exit")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--versions", type=int, default=900, help="Synthetic manifest size")
+    parser.add_argument("--sessions", type=int, default=50, help="Whitelisted sessions")
+    parser.add_argument("--threshold", type=int, default=2, help="service_state_threshold")
+    parser.add_argument("--latency", type=float, default=0.0, help="Injected server latency (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--hang", type=float, default=0.0, help="Seconds api.mojang.com stalls (forces timeouts)")
+    parser.add_argument("--no-304", action="store_true", help="Ignore conditional request headers")
+    parser.add_argument("--send-delay", type=float, default=0.0, help="Fake send_message latency (ms)")
+    parser.add_argument("--parser-rounds", type=int, default=50)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/replay-<time>.json)")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record_fixtures(args.record))
+        return
+
+    results = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"replay-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
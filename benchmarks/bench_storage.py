@@ -0,0 +1,77 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def data_root() -> str:
+    root = tempfile.mkdtemp(prefix="mcnews-storage-")
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+    os.environ["ASTRBOT_ROOT"] = root
+    return root
+
+
+def check_journal_recovery() -> bool:
+    from mcnews.storage import DataStorage
+
+    root = data_root()
+    try:
+        storage = DataStorage(journal=True)
+        storage.data["last_version_id"] = "a"
+        storage.save()
+        # A crash in the middle of an append leaves a torn last line.
+        with open(storage.journal_file, "ab") as f:
+            f.write(b'{"k":"last_version_id","v":"b')
+
+        storage = DataStorage(journal=True)
+        storage.data["last_version_id"] = "c"
+        storage.save()
+        storage.data["digest"] = {"last": 1}
+        storage.save()
+
+        storage = DataStorage(journal=True)
+        recovered = (storage.data["last_version_id"], storage.data["digest"])
+        print(f"journal recovery: {recovered}")
+        return recovered == ("c", {"last": 1})
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def measure(journal: bool, keys: int, rounds: int) -> float:
+    from mcnews.storage import DataStorage
+
+    root = data_root()
+    try:
+        storage = DataStorage(journal=journal)
+        storage.data["known_versions"] = [f"24w{i:02d}a" for i in range(keys)]
+        storage.save()
+        start = time.perf_counter()
+        for i in range(rounds):
+            storage.data["last_version_id"] = str(i)
+            storage.save()
+        return (time.perf_counter() - start) / rounds
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot vs journaled storage writes")
+    parser.add_argument("--keys", type=int, default=900, help="Entries in known_versions")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    if not check_journal_recovery():
+        print("Journal recovery lost writes")
+        sys.exit(1)
+
+    for name, journal in (("snapshot", False), ("journal", True)):
+        elapsed = measure(journal, args.keys, args.rounds)
+        print(f"{name:>9}: {elapsed * 1000:8.3f} ms/save")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcnews.constants import MC_VERSION_MANIFEST, JAVA_PATCH_NOTES, PATCH_NOTES_BASE, MOJANG_SERVICES
+
+from bench_manifest import synthetic_manifest
+from bench_article_parser import synthetic_article, synthetic_patch_notes
+
+
+def route_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.hostname}{parts.path}"
+
+
+class Fixture:
+
+    def __init__(self, body: bytes, content_type: str = "application/json"):
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+
+class Faults:
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        hang: float = 0.0,
+        no_304: bool = False,
+        seed: int = 173
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.hang = hang
+        self.no_304 = no_304
+        self.fail_paths: set = set()
+        self.hang_paths: set = set()
+        self._random = random.Random(seed)
+
+    def roll_error(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+
+class ReplayServer:
+
+    def __init__(self, fixtures: Dict[str, Fixture], faults: Optional[Faults] = None):
+        self.fixtures = fixtures
+        self.faults = faults or Faults()
+        self.stats: Counter = Counter()
+        self.base = ""
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._published = 0
+
+    def snapshot(self) -> Counter:
+        with self._lock:
+            return Counter(self.stats)
+
+    def _count(self, status: int, size: int):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += size
+            self.stats[f"status_{status}"] += 1
+
+    def _lookup(self, key: str) -> Optional[Fixture]:
+        fixture = self.fixtures.get(key)
+        if fixture is None and "/article/" in key:
+            fixture = self.fixtures.get("article")
+        return fixture
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        key = request.match_info["key"]
+        faults = self.faults
+        if faults.latency:
+            await asyncio.sleep(faults.latency)
+        if any(path in key for path in faults.hang_paths):
+            await asyncio.sleep(faults.hang)
+        if any(path in key for path in faults.fail_paths) or faults.roll_error():
+            self._count(503, 0)
+            return web.Response(status=503)
+
+        fixture = self._lookup(key)
+        if fixture is None:
+            self._count(404, 0)
+            return web.Response(status=404)
+        if not faults.no_304 and request.headers.get("If-None-Match") == fixture.etag:
+            self._count(304, 0)
+            return web.Response(status=304, headers={"ETag": fixture.etag})
+        self._count(200, len(fixture.body))
+        return web.Response(
+            body=fixture.body,
+            content_type=fixture.content_type,
+            headers={"ETag": fixture.etag}
+        )
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_route("*", "/{key:.+}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        port = self._runner.addresses[0][1]
+        self.base = f"http://127.0.0.1:{port}"
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._run, name="replay-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self.base
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def publish_version(self) -> str:
+        manifest_key = route_key(MC_VERSION_MANIFEST)
+        notes_key = route_key(JAVA_PATCH_NOTES)
+        manifest = json.loads(self.fixtures[manifest_key].body)
+        notes = json.loads(self.fixtures[notes_key].body)
+
+        self._published += 1
+        template = manifest["versions"][0]
+        version_id = f"bench-{int(time.time())}-{self._published}"
+        version = dict(template, id=version_id, type="snapshot")
+        version["releaseTime"] = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
+        version["url"] = template["url"].rsplit("/", 1)[0] + f"/{version_id}.json"
+        metadata = json.dumps({"id": version_id, "javaVersion": {"majorVersion": 21}}).encode("utf-8")
+        version["sha1"] = hashlib.sha1(metadata).hexdigest()
+        self.fixtures[route_key(version["url"])] = Fixture(metadata)
+
+        manifest["versions"].insert(0, version)
+        manifest["latest"]["snapshot"] = version_id
+        self.fixtures[manifest_key] = Fixture(json.dumps(manifest).encode("utf-8"))
+
+        entries = notes.get("entries", [])
+        if entries:
+            entry = dict(entries[0], version=version_id, id=f"{version_id}-notes")
+            entry["contentPath"] = f"java/{version_id}.json"
+            source = self.fixtures.get(route_key(PATCH_NOTES_BASE + entries[0].get("contentPath", "")))
+            if source is not None:
+                self.fixtures[route_key(PATCH_NOTES_BASE + entry["contentPath"])] = source
+            entries.insert(0, entry)
+            self.fixtures[notes_key] = Fixture(json.dumps(notes).encode("utf-8"))
+        return version_id
+
+
+def synthetic_fixtures(versions: int = 900, articles: int = 5) -> Dict[str, Fixture]:
+    fixtures: Dict[str, Fixture] = {}
+    manifest = json.loads(synthetic_manifest(versions))
+    for i, version in enumerate(manifest["versions"]):
+        version["releaseTime"] = time.strftime(
+            "%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(1700000000 - i * 7 * 86400)
+        )
+        metadata = json.dumps({
+            "id": version["id"],
+            "javaVersion": {"majorVersion": 21},
+            "assetIndex": {"id": "17"},
+        }).encode("utf-8")
+        version["url"] = f"https://piston-meta.mojang.com/v1/packages/{i}/{version['id']}.json"
+        version["sha1"] = hashlib.sha1(metadata).hexdigest()
+        fixtures[route_key(version["url"])] = Fixture(metadata)
+    fixtures[route_key(MC_VERSION_MANIFEST)] = Fixture(json.dumps(manifest, indent=2).encode("utf-8"))
+
+    article = synthetic_article(60)
+    body = synthetic_patch_notes(60)
+    entries = []
+    for version in manifest["versions"][:articles]:
+        content_path = f"java/{version['id']}.json"
+        entries.append({
+            "title": f"Minecraft {version['id']}",
+            "version": version["id"],
+            "id": f"{version['id']}-notes",
+            "date": version["releaseTime"],
+            "contentPath": content_path,
+        })
+        fixtures[route_key(PATCH_NOTES_BASE + content_path)] = Fixture(
+            json.dumps({"body": body}).encode("utf-8")
+        )
+    fixtures[route_key(JAVA_PATCH_NOTES)] = Fixture(
+        json.dumps({"version": 1, "entries": entries}).encode("utf-8")
+    )
+    fixtures["article"] = Fixture(article.encode("utf-8"), "text/html")
+
+    for service in MOJANG_SERVICES:
+        fixtures[route_key(service["url"])] = Fixture(b'{"ok":true}')
+    return fixtures
+
+
+def load_fixtures(directory: str) -> Dict[str, Fixture]:
+    with open(os.path.join(directory, "index.json"), "r", encoding="utf-8") as f:
+        index = json.load(f)
+    fixtures = {}
+    for url, entry in index.items():
+        with open(os.path.join(directory, entry["file"]), "rb") as f:
+            fixtures[url if url == "article" else route_key(url)] = Fixture(f.read(), entry["content_type"])
+    return fixtures
+
+
+async def record_fixtures(directory: str, articles: int = 3):
+    import aiohttp
+
+    os.makedirs(directory, exist_ok=True)
+    index = {}
+
+    async with aiohttp.ClientSession() as session:
+        async def save(url: str, name: str) -> bytes:
+            async with session.get(url) as resp:
+                resp.raise_for_status()
+                body = await resp.read()
+                content_type = resp.content_type
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(body)
+            index[url] = {"file": name, "content_type": content_type}
+            return body
+
+        manifest = json.loads(await save(MC_VERSION_MANIFEST, "version_manifest_v2.json"))
+        for i, version in enumerate(manifest["versions"][:5]):
+            await save(version["url"], f"version_{i}.json")
+        notes = json.loads(await save(JAVA_PATCH_NOTES, "javaPatchNotes.json"))
+        for i, entry in enumerate(notes.get("entries", [])[:articles]):
+            await save(PATCH_NOTES_BASE + entry["contentPath"], f"patch_notes_{i}.json")
+        for i, service in enumerate(MOJANG_SERVICES):
+            try:
+                await save(service["url"], f"service_{i}.json")
+            except aiohttp.ClientError as e:
+                print(f"Skipping {service['name']}: {e}")
+
+    with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    print(f"Recorded {len(index)} responses into {directory}")
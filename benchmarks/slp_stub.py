@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import json
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcnews.slp import pack_packet, pack_string, read_packet, decode_varint
+
+
+class StubSLPServer:
+
+    def __init__(self, delay: float = 0.0, version: str = "Stub 1.21", players: int = 3, pong: bool = True):
+        self.delay = delay
+        self.version = version
+        self.players = players
+        self.pong = pong
+        self.connections = 0
+        self.active = 0
+        self.peak = 0
+        self._server = None
+
+    def status(self):
+        return {
+            "version": {"name": self.version, "protocol": 767},
+            "players": {"max": 20, "online": self.players},
+            "description": {"text": "MCNews stub server"}
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            packet_id, payload = await read_packet(reader)
+            if packet_id != 0x00:
+                return
+            next_state, _ = decode_varint(payload, len(payload) - 1)
+            if next_state != 1:
+                return
+            packet_id, _ = await read_packet(reader)
+            if packet_id != 0x00:
+                return
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            writer.write(pack_packet(0x00, pack_string(json.dumps(self.status()))))
+            await writer.drain()
+            if not self.pong:
+                return
+            packet_id, payload = await read_packet(reader)
+            if packet_id == 0x01:
+                writer.write(pack_packet(0x01, payload[:8]))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError, struct.error):
+            pass
+        finally:
+            self.active -= 1
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def serve(args):
+    server = StubSLPServer(delay=args.delay, players=args.players, pong=not args.no_pong)
+    port = await server.start(args.host, args.port)
+    print(f"Stub SLP server listening on {args.host}:{port}")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minimal Minecraft Server List Ping responder")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25565)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering status")
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--no-pong", action="store_true", help="Close the connection instead of answering ping")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
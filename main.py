@@ -1,5 +1,10 @@
+import os
 import asyncio
-from typing import Dict
+import sqlite3
+import time
+import uuid
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
 
 import astrbot.api.star as star
 from astrbot.api.event import filter, AstrMessageEvent
@@ -7,10 +12,48 @@ from astrbot.api.event import MessageEventResult
 from astrbot.api import logger, AstrBotConfig
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from .mcnews.models import MCVersion
+from .mcnews.models import MCVersion, DeliveryReport, MojangServiceStatus, ServiceChange
 from .mcnews.fetcher import MCNewsFetcher
 from .mcnews.formatter import MCNewsFormatter
 from .mcnews.storage import DataStorage
+from .mcnews.sqlite_storage import SQLiteStorage
+from .mcnews.executor import CPUExecutor, LoopLagMonitor
+from .mcnews.delivery import DeliveryEngine
+from .mcnews.outbox import DeliveryOutbox
+from .mcnews.cache import SnapshotCache
+from .mcnews.metadata import VersionMetadataCache
+from .mcnews.patch_notes import PatchNotesEngine
+from .mcnews.changelog import ChangelogStore
+from .mcnews.search import ChangelogSearchIndex
+from .mcnews.manifest import diff_new_versions
+from .mcnews.version_index import VersionIndex
+from .mcnews.scheduling import PollingPolicy
+from .mcnews.probe import ServiceStateTracker
+from .mcnews.latency import ServiceHistory
+from .mcnews.registry import ServiceRegistry
+from .mcnews.metrics import MetricsRegistry, CycleProfiler
+from .mcnews.coordination import LeaseCoordinator, default_instance, instance_filename
+from .mcnews.coalesce import NotificationCoalescer
+from .mcnews.constants import (
+    OUTBOX_RETRY_INTERVAL,
+    SCHEDULE_RECONCILE_INTERVAL,
+    COORDINATION_INTERVAL,
+    COORDINATION_FEED_KEEP,
+    METRICS_EXPORT_INTERVAL,
+    PROFILE_FILE,
+    SERVICE_STATE_THRESHOLD,
+    PROBE_CONCURRENCY,
+    PROBE_STAGGER_WINDOW,
+    ARTICLE_FETCH_CONCURRENCY,
+    STATUS_CACHE_TTL,
+    LATEST_CACHE_TTL,
+    HISTORY_MAX_COUNT,
+    SEARCH_SNIPPETS,
+    MANIFEST_HEAD_SIZE,
+    CHANGELOG_SECTIONS,
+    NOTIFY_COALESCE_WINDOW,
+    DIGEST_PERIOD
+)
 
 
 class Main(star.Star):
@@ -20,39 +63,418 @@ class Main(star.Star):
         self.context = context
         self.config = config
         self.scheduler = AsyncIOScheduler()
-        self.storage = DataStorage()
-        self.last_service_status: Dict[str, bool] = {}
+        self.metrics = MetricsRegistry()
+        journal = self.config.get("storage_journal", False)
+        # Nothing touches the shared data file until the lease is ours.
+        coordination = self.config.get("coordination", False)
+        if self.config.get("storage_backend", "json") == "sqlite":
+            self.storage = SQLiteStorage(read_only=coordination)
+        else:
+            self.storage = DataStorage(journal=journal, read_only=coordination)
+        self.storage.metrics = self.metrics
+        self.coordinator: Optional[LeaseCoordinator] = None
+        outbox_file = "mcnews_outbox.json"
+        if coordination:
+            instance = self.config.get("coordination_instance", "") or default_instance()
+            self.coordinator = LeaseCoordinator(self.storage.data_dir, instance)
+            outbox_file = instance_filename(outbox_file, instance)
+        self._leading: Optional[bool] = None
+        self._shared_index: Optional[VersionIndex] = None
+        self._index_synced: Optional[float] = None
+        self.outbox = DeliveryOutbox(outbox_file, journal=journal)
+        self.outbox.metrics = self.metrics
+        self._outbox_lock = asyncio.Lock()
+        self.executor = CPUExecutor(
+            mode=self.config.get("cpu_executor_mode", "thread"),
+            threshold=self.config.get("cpu_offload_threshold_kb", 64) * 1024
+        )
+        self.loop_lag = LoopLagMonitor()
+        self.fetcher = MCNewsFetcher(self.storage, self.executor, self.metrics)
+        self.metadata = VersionMetadataCache(self.fetcher, self.storage.data_dir)
+        self.changelog = ChangelogStore(self.storage.data_dir)
+        self.search = ChangelogSearchIndex(self.storage.data_dir, self.changelog)
+        self.search.read_only = self.storage.read_only
+        self.patch_notes = PatchNotesEngine(self.fetcher, self.executor, self.changelog)
+        self.patch_notes.mirror.metrics = self.metrics
+        self.registry = ServiceRegistry(self.config)
+        self.status_cache = SnapshotCache(
+            self._load_services,
+            ttl=self.config.get("status_cache_ttl", STATUS_CACHE_TTL)
+        )
+        self.latest_cache = SnapshotCache(
+            self._load_latest,
+            ttl=self.config.get("latest_cache_ttl", LATEST_CACHE_TTL)
+        )
+        self.delivery = DeliveryEngine(
+            self._send_message,
+            concurrency=self.config.get("delivery_concurrency", 8),
+            rate=self.config.get("delivery_rate_limit", 5.0),
+            metrics=self.metrics
+        )
+        profile_file = PROFILE_FILE
+        if self.coordinator is not None:
+            profile_file = instance_filename(profile_file, self.coordinator.instance)
+        self.profiler = CycleProfiler(os.path.join(self.storage.data_dir, profile_file))
+        self._run_version_check = self.metrics.timed("mcnews_check", self._check_versions, job="versions")
+        self._run_service_check = self.metrics.timed("mcnews_check", self._check_service_status, job="services")
+        self.service_states = ServiceStateTracker()
+        self.service_history = ServiceHistory()
+        self.coalescer = NotificationCoalescer(
+            self._deliver_service_changes,
+            window=self.config.get("notify_coalesce_window", NOTIFY_COALESCE_WINDOW) * 60
+        )
+        self._restore_state()
+        self._digest_at = self._parse_digest_time()
+        self.polling = PollingPolicy(self.config)
+        self._job_intervals: Dict[str, int] = {}
         self._init_scheduler()
 
     def _init_scheduler(self):
+        self._job_intervals["check_versions"] = self.polling.version_interval()
+        self._job_intervals["check_service_status"] = self.polling.service_interval()
         self.scheduler.add_job(
-            self._check_versions,
+            self._run_version_check,
             "interval",
-            minutes=self.config.get("version_check_interval", 15),
+            seconds=self._job_intervals["check_versions"],
             id="check_versions",
             misfire_grace_time=60
         )
         self.scheduler.add_job(
-            self._check_service_status,
+            self._run_service_check,
             "interval",
-            minutes=self.config.get("service_check_interval", 5),
+            seconds=self._job_intervals["check_service_status"],
             id="check_service_status",
             misfire_grace_time=60
         )
+        self.scheduler.add_job(
+            self._retry_outbox,
+            "interval",
+            seconds=OUTBOX_RETRY_INTERVAL,
+            id="retry_outbox",
+            misfire_grace_time=60
+        )
+        self.scheduler.add_job(
+            self._reconcile_schedule,
+            "interval",
+            seconds=SCHEDULE_RECONCILE_INTERVAL,
+            id="reconcile_schedule",
+            misfire_grace_time=60
+        )
+        if self.coordinator is not None:
+            self.scheduler.add_job(
+                self._coordinate,
+                "interval",
+                seconds=COORDINATION_INTERVAL,
+                id="coordinate",
+                misfire_grace_time=COORDINATION_INTERVAL
+            )
+        if self._digest_at is not None:
+            self.scheduler.add_job(
+                self._send_digest,
+                "cron",
+                hour=self._digest_at[0],
+                minute=self._digest_at[1],
+                id="send_digest",
+                misfire_grace_time=3600
+            )
+        if self._metrics_textfile():
+            self.scheduler.add_job(
+                self._export_metrics,
+                "interval",
+                seconds=METRICS_EXPORT_INTERVAL,
+                id="export_metrics",
+                misfire_grace_time=60
+            )
         self.scheduler.start()
         logger.info("MCNews: Scheduler started")
 
+    def _reschedule(self, job_id: str, seconds: int):
+        if self._job_intervals.get(job_id) == seconds:
+            return
+        self._job_intervals[job_id] = seconds
+        self.scheduler.reschedule_job(job_id, trigger="interval", seconds=seconds)
+        logger.info(f"MCNews: Rescheduled {job_id} every {seconds}s")
+
+    async def _reconcile_schedule(self):
+        if self.polling.learn(self.fetcher.version_index):
+            windows = self.polling.windows
+            logger.info(
+                f"MCNews: Learned {len(windows.windows())} release window hours "
+                f"from {windows.samples} versions"
+            )
+        self._reschedule("check_versions", self.polling.version_interval())
+        self._reschedule("check_service_status", self.polling.service_interval())
+
+    @property
+    def is_leader(self) -> bool:
+        return self.coordinator is None or self.coordinator.leader
+
+    async def _coordinate(self):
+        coordinator = self.coordinator
+        if not coordinator.leader:
+            await self._sync_version_index()
+            await self._follow_feed()
+        try:
+            leading = await coordinator.acquire()
+        except sqlite3.Error as e:
+            logger.warning(f"MCNews: Failed to renew poller lease: {e}")
+            coordinator.holder = ""
+            leading = False
+
+        if leading != self._leading:
+            self._leading = leading
+            if leading:
+                await self._become_leader()
+            else:
+                self.storage.read_only = True
+                self.search.read_only = True
+                logger.info(
+                    f"MCNews: Following poller lease held by {coordinator.holder or 'nobody'} "
+                    f"as {coordinator.instance}"
+                )
+                await self._sync_version_index()
+        if leading:
+            try:
+                latest = await coordinator.latest_seq()
+            except sqlite3.Error:
+                return
+            if self.outbox.data.get("feed_seq") != latest:
+                self.outbox.data["feed_seq"] = latest
+                self.outbox.save()
+
+    async def _become_leader(self):
+        self.storage.read_only = False
+        await self.storage.reload()
+        self.search.read_only = False
+        # Reload with compaction and backfill, which only the holder may do.
+        self.search.reset()
+        self.service_states.load(self.storage.get_service_states())
+        self.service_history.load(self.storage.get_last_services_status())
+        self.coalescer.load(self.storage.get_pending_changes())
+        logger.info(
+            f"MCNews: Acquired poller lease as {self.coordinator.instance} "
+            f"(term {self.coordinator.term})"
+        )
+
+    async def _follow_feed(self):
+        try:
+            cursor = self.outbox.data.get("feed_seq")
+            if cursor is None:
+                self.outbox.data["feed_seq"] = await self.coordinator.latest_seq()
+                self.outbox.save()
+                return
+            entries = await self.coordinator.read_feed(cursor)
+        except sqlite3.Error as e:
+            logger.warning(f"MCNews: Failed to read shared notifications: {e}")
+            return
+        for seq, notification_id, message in entries:
+            await self._send_to_whitelist(message, notification_id)
+            self.outbox.data["feed_seq"] = seq
+        if entries:
+            self.outbox.save()
+
+    async def _publish_snapshot(self, key: str, value: Any):
+        if self.coordinator is None:
+            return
+        try:
+            await self.coordinator.put_snapshot(key, value)
+        except sqlite3.Error as e:
+            logger.warning(f"MCNews: Failed to share {key} snapshot: {e}")
+
+    async def _refresh_version_index(self):
+        index = await self.fetcher.refresh_version_index()
+        if self.coordinator is None or not index or index is self._shared_index:
+            return
+        self._shared_index = index
+        await self._publish_snapshot("version_index", index.dump())
+
+    async def _sync_version_index(self):
+        # Followers never download the full manifest; they take the index
+        # the leader built, and only when it has changed.
+        try:
+            updated = await self.coordinator.snapshot_updated("version_index")
+            if updated is None or updated == self._index_synced:
+                return
+            rows, updated = await self.coordinator.get_snapshot("version_index")
+        except sqlite3.Error as e:
+            logger.warning(f"MCNews: Failed to read shared version index: {e}")
+            return
+        try:
+            self.fetcher.version_index = VersionIndex.load(rows)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"MCNews: Discarding shared version index: {e}")
+            return
+        self._index_synced = updated
+
+    async def _load_services(self) -> Tuple[List[MojangServiceStatus], Optional[float]]:
+        if self.is_leader:
+            return await self._probe_services(), None
+        # Followers keep the leader's timestamp so replies show how old the
+        # shared result really is.
+        try:
+            services, updated = await self.coordinator.get_snapshot("services")
+        except sqlite3.Error:
+            return [], None
+        await self.storage.reload()
+        self.service_history.load(self.storage.get_last_services_status())
+        return [MojangServiceStatus(**service) for service in services or []], updated
+
+    async def _load_latest(self) -> Tuple[Dict[str, Any], Optional[float]]:
+        if self.is_leader:
+            return await self.fetcher.fetch_manifest_head(), None
+        try:
+            version_data, updated = await self.coordinator.get_snapshot("manifest_head")
+        except sqlite3.Error:
+            return {}, None
+        return version_data or {}, updated
+
+    def _restore_state(self):
+        self.service_states.load(self.storage.get_service_states())
+        self.service_history.load(self.storage.get_last_services_status())
+        self.coalescer.load(self.storage.get_pending_changes())
+        self._restore_snapshots()
+
+    def _restore_snapshots(self):
+        snapshot = self.storage.get_services_snapshot()
+        try:
+            services = [MojangServiceStatus(**service) for service in snapshot.get("services", [])]
+        except TypeError:
+            services = []
+        self.status_cache.put(services, snapshot.get("updated"))
+        self.latest_cache.put(self.fetcher.manifest_head, self.fetcher.manifest_updated)
+
     async def initialize(self):
         logger.info("MCNews: Plugin activated, starting initial check...")
-        await asyncio.sleep(10)
-        asyncio.create_task(self._init_service_status())
-        asyncio.create_task(self._check_versions())
+        if await self.storage.open():
+            self.fetcher.restore_manifest_cache()
+            self._restore_state()
+        await self.fetcher.start()
+        self.loop_lag.start()
+        if self.coordinator is not None:
+            await self._coordinate()
+        if self.outbox.has_pending():
+            logger.info("MCNews: Replaying pending deliveries from outbox")
+            asyncio.create_task(self._replay_outbox())
+        if self.is_leader and len(self.coalescer):
+            asyncio.create_task(self.coalescer.commit())
+        # Restored states turn the first probe into a normal check, so changes
+        # that happened while the plugin was down are still reported.
+        if self.service_states.confirmed:
+            asyncio.create_task(self._run_service_check())
+        else:
+            asyncio.create_task(self._init_service_status())
+        asyncio.create_task(self._run_version_check())
 
     async def terminate(self):
         self.scheduler.shutdown()
+        self.coalescer.close()
+        if self._metrics_textfile():
+            await self._export_metrics()
+        await self.fetcher.close()
+        await self.loop_lag.stop()
+        self.executor.shutdown()
+        self.storage.set_last_services_status(self.service_history.dump())
+        self.storage.set_pending_changes(self.coalescer.dump())
         self.storage.save()
+        await self.storage.close()
+        await self.outbox.close()
+        await self.patch_notes.close()
+        if self.coordinator is not None:
+            await self.coordinator.close()
         logger.info("MCNews: Plugin terminated")
 
+    def _metrics_textfile(self) -> str:
+        path = self.config.get("metrics_textfile", "")
+        if not path:
+            return ""
+        if self.coordinator is not None:
+            path = instance_filename(path, self.coordinator.instance)
+        return path if os.path.isabs(path) else os.path.join(self.storage.data_dir, path)
+
+    def _collect_runtime_metrics(self) -> Dict[str, str]:
+        metrics = self.metrics
+        lag = self.loop_lag.stats()
+        metrics.set("mcnews_loop_lag_seconds", lag["avg_ms"] / 1000, stat="avg")
+        metrics.set("mcnews_loop_lag_seconds", lag["max_ms"] / 1000, stat="max")
+        metrics.set("mcnews_loop_stalls", lag["stalls"])
+        metrics.set("mcnews_cpu_tasks", self.executor.offloaded, placement="offloaded")
+        metrics.set("mcnews_cpu_tasks", self.executor.inlined, placement="inline")
+        manifest = self.fetcher.manifest_stats
+        metrics.set("mcnews_manifest_cache", manifest["hits"], result="hit")
+        metrics.set("mcnews_manifest_cache", manifest["misses"], result="miss")
+        metrics.set("mcnews_manifest_bytes_saved", manifest["bytes_saved"])
+        probes = self.fetcher.probe_stats
+        for connection, count in probes.items():
+            metrics.set("mcnews_probe_connections", count, connection=connection)
+        metadata = self.metadata.stats
+        for result, count in metadata.items():
+            metrics.set("mcnews_version_metadata", count, result=result)
+        patch_notes = self.patch_notes.stats
+        for result, count in patch_notes.items():
+            metrics.set("mcnews_patch_notes", count, result=result)
+        caches = {"status": self.status_cache, "latest": self.latest_cache}
+        for name, cache in caches.items():
+            metrics.set("mcnews_reply_cache", cache.hits, cache=name, result="hit")
+            metrics.set("mcnews_reply_cache", cache.misses, cache=name, result="miss")
+        pending = len(self.outbox.data.get("pending", {}))
+        metrics.set("mcnews_outbox_pending", pending)
+        metrics.set("mcnews_changes_pending", len(self.coalescer))
+        metrics.set("mcnews_flaps_collapsed", self.coalescer.flaps)
+        metrics.set("mcnews_uptime_seconds", time.time() - metrics.started)
+
+        storage = self.storage.stats
+        return {
+            "Event loop lag": f"avg {lag['avg_ms']:.1f}ms, max {lag['max_ms']:.0f}ms, {lag['stalls']} stalls",
+            "CPU executor": f"{self.executor.offloaded} offloaded, {self.executor.inlined} inline ({self.executor.mode})",
+            "Manifest cache": (
+                f"{manifest['hits']} hits, {manifest['misses']} misses, "
+                f"{manifest['bytes_saved'] / 1048576:.1f} MiB saved"
+            ),
+            "Probe connections": f"{probes['reused']} reused, {probes['new']} new",
+            "Version metadata": (
+                f"{metadata['downloads']} downloads, {metadata['cached']} cached, "
+                f"{metadata['sha1_mismatch']} SHA1 mismatches"
+            ),
+            "Patch notes": (
+                f"index {patch_notes['index_updates']} updates, {patch_notes['index_not_modified']} not modified; "
+                f"{patch_notes['bodies']} bodies fetched, {patch_notes['local']} local"
+            ),
+            "Reply caches": ", ".join(
+                f"{name} {cache.hits} hits/{cache.misses} misses" for name, cache in caches.items()
+            ),
+            "Storage": (
+                f"{storage['saves']} saves, {storage['flushes']} flushes, "
+                f"max latency {storage['max_latency_ms']:.0f}ms"
+            ),
+            "Outbox pending": str(pending),
+            "Service changes": (
+                f"{len(self.coalescer)} waiting, {self.coalescer.flaps} flaps collapsed, "
+                f"digest {self.config.get('digest_time', '') or 'disabled'}"
+            ),
+            "Metrics file": self._metrics_textfile() or "disabled",
+            "Coordination": self._coordination_state(),
+        }
+
+    def _coordination_state(self) -> str:
+        coordinator = self.coordinator
+        if coordinator is None:
+            return "disabled"
+        if coordinator.leader:
+            return f"leader {coordinator.instance} (term {coordinator.term})"
+        return f"follower {coordinator.instance}, leader {coordinator.holder or 'none'}"
+
+    async def _export_metrics(self):
+        path = self._metrics_textfile()
+        self._collect_runtime_metrics()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.metrics.write_textfile, path)
+        except OSError as e:
+            logger.warning(f"MCNews: Failed to write metrics to {path}: {e}")
+
+    async def _profiled_cycle(self):
+        await self._run_version_check()
+        await self._run_service_check()
+
     def _get_whitelist(self):
         return self.config.get("whitelist", [])
 
@@ -74,97 +496,335 @@ class Main(star.Star):
         self.config.save_config()
         return True
 
-    async def _send_to_whitelist(self, message: str):
+    async def _send_message(self, session: str, message: str):
+        await self.context.send_message(
+            session,
+            MessageEventResult().message(message)
+        )
+
+    async def _publish_to_feed(self, notification_id: str, message: str):
+        if self.coordinator is None or not self.is_leader:
+            return
+        try:
+            await self.coordinator.publish(notification_id, message)
+        except sqlite3.Error as e:
+            logger.warning(f"MCNews: Failed to share {notification_id} with followers: {e}")
+
+    async def _enqueue(self, notification_id: str, message: str) -> bool:
+        # Followers learn about a push only from the feed, so it is shared
+        # before anything counts as handled, alongside the outbox write.
+        await self._publish_to_feed(notification_id, message)
         whitelist = self._get_whitelist()
         if not whitelist:
-            return
+            return False
+        if self.outbox.enqueue(notification_id, message, list(whitelist)):
+            await self.outbox.save_now()
+        return True
 
-        for session in whitelist:
-            try:
-                await self.context.send_message(
-                    session,
-                    MessageEventResult().message(message)
-                )
-            except Exception as e:
-                logger.error(f"MCNews: Failed to send message to {session}: {e}")
+    async def _send_to_whitelist(self, message: str, notification_id: Optional[str] = None) -> DeliveryReport:
+        notification_id = notification_id or f"message:{uuid.uuid4().hex}"
+        if not await self._enqueue(notification_id, message):
+            return DeliveryReport()
+        return await self._flush_outbox(notification_id)
+
+    async def _replay_outbox(self):
+        # A restart between a send and the next outbox save leaves sessions
+        # pending that the delivery history already records as sent.
+        skipped = 0
+        for nid, sessions in self.outbox.due(float("inf")).items():
+            for session, _, ok, _ in await self.storage.delivery_history(nid):
+                if ok and session in sessions:
+                    self.outbox.mark_delivered(nid, session)
+                    skipped += 1
+        if skipped:
+            logger.info(f"MCNews: Skipped {skipped} outbox deliveries already recorded as sent")
+            self.outbox.save()
+        # A leader that stopped after writing its outbox may not have shared
+        # the entries yet. The feed ignores ids it still holds, and anything
+        # older than the feed keeps would be news to followers again.
+        notifications = self.outbox.data.get("notifications", {})
+        cutoff = time.time() - COORDINATION_FEED_KEEP
+        for nid in self.outbox.due(float("inf")):
+            entry = notifications.get(nid)
+            if entry is not None and entry.get("created", 0) >= cutoff:
+                await self._publish_to_feed(nid, entry["message"])
+        await self._retry_outbox()
+
+    async def _flush_outbox(self, notification_id: Optional[str] = None) -> DeliveryReport:
+        async with self._outbox_lock:
+            return await self._flush_outbox_locked(notification_id)
+
+    async def _flush_outbox_locked(self, notification_id: Optional[str]) -> DeliveryReport:
+        report = DeliveryReport()
+        for nid, sessions in self.outbox.due().items():
+            if notification_id is not None and nid != notification_id:
+                continue
+            message = self.outbox.get_message(nid)
+            if message is None:
+                continue
+
+            def on_result(session: str, error: Optional[str], nid: str = nid):
+                self.storage.record_delivery(nid, session, error)
+                if error is None:
+                    self.outbox.mark_delivered(nid, session)
+                elif not self.outbox.mark_failed(nid, session, error):
+                    logger.error(f"MCNews: Giving up on {nid} for {session}: {error}")
+
+            result = await self.delivery.deliver(sessions, message, on_result)
+            self.outbox.save()
+            for session, error in result.failed.items():
+                logger.error(f"MCNews: Failed to send message to {session}: {error}")
+            logger.info(
+                f"MCNews: Delivered {nid} to {result.sent}/{result.total} sessions "
+                f"in {result.elapsed:.2f}s ({len(result.failed)} failed)"
+            )
+            report.total += result.total
+            report.sent += result.sent
+            report.failed.update(result.failed)
+            report.elapsed += result.elapsed
+        return report
+
+    async def _retry_outbox(self):
+        if self.outbox.has_pending():
+            await self._flush_outbox()
+
+    async def _probe_services(self, stagger: float = 0.0) -> List[MojangServiceStatus]:
+        services = self.registry.services()
+        if self.registry.invalid:
+            logger.warning(f"MCNews: Ignoring invalid custom services: {', '.join(self.registry.invalid)}")
+            self.registry.invalid = []
+        return await self.fetcher.fetch_all_services_status(
+            services,
+            concurrency=self.config.get("probe_concurrency", PROBE_CONCURRENCY),
+            stagger=stagger
+        )
+
+    def _persist_services(self, services: List[MojangServiceStatus], snapshot: List[Dict[str, Any]]):
+        self.storage.set_services_snapshot(snapshot, time.time())
+        self.storage.set_service_states(self.service_states.dump(service.name for service in services))
+        self.storage.set_pending_changes(self.coalescer.dump())
+        if self.service_history.due():
+            self.storage.set_last_services_status(self.service_history.dump())
+        self.storage.save()
 
     async def _init_service_status(self):
-        services = await MCNewsFetcher.fetch_all_services_status()
+        if not self.is_leader:
+            return
+        services = await self._probe_services()
+        self.status_cache.put(services)
+        snapshot = [asdict(service) for service in services]
+        await self._publish_snapshot("services", snapshot)
         for service in services:
-            self.last_service_status[service.name] = service.online
+            self.service_states.seed(service.name, service.online)
+            self.service_history.record(service)
+        self._persist_services(services, snapshot)
         logger.info(f"MCNews: Initialized service status tracking for {len(services)} services")
 
     async def _check_service_status(self):
-        if not self.config.get("notify_service_status", True):
+        if not self.is_leader or not self.config.get("notify_service_status", True):
             return
 
-        services = await MCNewsFetcher.fetch_all_services_status()
+        services = await self._probe_services(
+            stagger=self.config.get("probe_stagger_seconds", PROBE_STAGGER_WINDOW)
+        )
         if not services:
             return
+        self.status_cache.put(services)
+        snapshot = [asdict(service) for service in services]
+        await self._publish_snapshot("services", snapshot)
+        self.polling.observe_services(services)
+        self._reschedule("check_service_status", self.polling.service_interval())
 
         for service in services:
-            last_status = self.last_service_status.get(service.name)
-            
-            if last_status is None:
-                self.last_service_status[service.name] = service.online
-                continue
+            self.service_history.record(service)
 
-            if last_status != service.online:
-                self.last_service_status[service.name] = service.online
-                
-                message = MCNewsFormatter.format_service_change(
-                    service.name,
-                    service.online,
-                    service.latency,
-                    service.error_message
-                )
-                
-                await self._send_to_whitelist(message)
-                await asyncio.sleep(1)
+        for service in services:
+            self.storage.record_probe(
+                service.name,
+                service.online,
+                service.latency,
+                service.error_message
+            )
+            changed = self.service_states.observe(
+                service.name,
+                service.online,
+                self.config.get("service_state_threshold", SERVICE_STATE_THRESHOLD)
+            )
+            if changed:
+                self.coalescer.add(ServiceChange(
+                    name=service.name,
+                    online=service.online,
+                    latency=service.latency,
+                    error_message=service.error_message,
+                    group=service.group
+                ))
+
+        self._persist_services(services, snapshot)
+        await self.coalescer.commit()
+
+    async def _deliver_service_changes(self, changes: List[ServiceChange]):
+        if self._digest_at is not None:
+            digest = self.storage.get_digest_state()
+            outages = digest.setdefault("outages", {})
+            for change in changes:
+                if not change.online:
+                    outages[change.name] = outages.get(change.name, 0) + 1
+            self.storage.set_digest_state(digest)
+
+        if not self.config.get("digest_only", False) or self._digest_at is None:
+            summaries = {}
+            for change in changes:
+                summary = self.service_history.summary(change.name).get("24h")
+                if summary is not None:
+                    summaries[change.name] = summary
+            message = MCNewsFormatter.format_service_changes(changes, summaries)
+            states = "+".join(f"{change.name}:{'up' if change.online else 'down'}" for change in changes)
+            await self._send_to_whitelist(message, f"service:{states}:{int(time.time())}")
+            logger.info(f"MCNews: Pushed {len(changes)} service changes in one message")
+
+        self.storage.set_pending_changes(self.coalescer.dump())
+        self.storage.save()
 
-    async def _check_versions(self):
-        if not self.config.get("notify_versions", True):
+    def _parse_digest_time(self) -> Optional[Tuple[int, int]]:
+        value = self.config.get("digest_time", "").strip()
+        if not value:
+            return None
+        try:
+            hour, minute = (int(part) for part in value.split(":"))
+        except ValueError:
+            hour = minute = -1
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            logger.warning(f"MCNews: Ignoring invalid digest time {value!r}, expected HH:MM")
+            return None
+        return hour, minute
+
+    async def _build_digest(self, state: Dict[str, Any], collapsed: Dict[str, int]) -> str:
+        since = state.get("last") or time.time() - DIGEST_PERIOD
+        if self.is_leader:
+            index = await self.fetcher.refresh_version_index()
+        else:
+            index = self.fetcher.version_index
+        versions = index.since(time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(since)))
+        if not self.config.get("notify_snapshot", True):
+            versions = [entry for entry in versions if entry.type != "snapshot"]
+        services, _ = await self.status_cache.get()
+        summaries = {}
+        for service in services or []:
+            summary = self.service_history.summary(service.name).get("24h")
+            if summary is not None:
+                summaries[service.name] = summary
+        return MCNewsFormatter.format_digest(
+            since,
+            versions,
+            services or [],
+            summaries,
+            state.get("outages", {}),
+            collapsed
+        )
+
+    async def _send_digest(self):
+        if not self.is_leader:
             return
+        now = time.time()
+        message = await self._build_digest(self.storage.get_digest_state(), self.coalescer.pop_collapsed())
+        self.storage.set_digest_state({"last": now})
+        self.storage.set_pending_changes(self.coalescer.dump())
+        self.storage.save()
+        await self._send_to_whitelist(message, f"digest:{int(now)}")
+        logger.info("MCNews: Pushed scheduled digest")
 
-        version_data = await MCNewsFetcher.fetch_versions()
+    async def _check_versions(self):
+        if not self.is_leader:
+            return
+        version_data = await self.fetcher.fetch_manifest_head()
+        stats = self.fetcher.manifest_stats
+        logger.debug(
+            f"MCNews: Manifest cache hits={stats['hits']} misses={stats['misses']} "
+            f"bytes_saved={stats['bytes_saved']}"
+        )
         if not version_data:
             return
+        self.latest_cache.put(version_data)
+        await self._publish_snapshot("manifest_head", version_data)
+        unshared = self.coordinator is not None and self.fetcher.version_index is not self._shared_index
+        if unshared or self.fetcher.version_index_stale():
+            asyncio.create_task(self._refresh_version_index())
+        asyncio.create_task(self.metadata.prefetch(version_data.get("versions", [])[:MANIFEST_HEAD_SIZE]))
 
         versions = version_data.get("versions", [])
         if not versions:
             return
 
-        latest_version = versions[0]
-        latest_id = latest_version.get("id", "")
-        latest_type = latest_version.get("type", "")
-
+        known = self.storage.get_known_versions()
         last_notified = self.storage.get_last_notified_version()
-        notify_snapshot = self.config.get("notify_snapshot", True)
+        new_entries = diff_new_versions(versions, known, last_notified)
+        head_ids = [v.get("id", "") for v in reversed(versions)]
 
-        if latest_id == last_notified:
-            return
+        # With notifications off the versions still count as seen, so turning
+        # them back on does not replay everything released in between.
+        if not self.config.get("notify_versions", True):
+            new_entries = []
 
-        if latest_type == "snapshot" and not notify_snapshot:
-            self.storage.set_last_notified_version(latest_id)
-            self.storage.save()
+        notify_snapshot = self.config.get("notify_snapshot", True)
+        if not notify_snapshot:
+            new_entries = [v for v in new_entries if v.get("type") != "snapshot"]
+        # known_versions is trimmed, so an old id dropped from it could look new
+        # again; the notified history is kept much longer.
+        new_entries = [
+            v for v in new_entries if not await self.storage.is_version_notified(v.get("id", ""))
+        ]
+
+        if not new_entries:
+            if not known or versions[0].get("id", "") != last_notified:
+                self.storage.add_known_versions(head_ids)
+                self.storage.set_last_notified_version(versions[0].get("id", ""))
+                self.storage.save()
             return
 
-        mc_version = MCVersion(
-            id=latest_id,
-            type=latest_type,
-            url=latest_version.get("url", ""),
-            time=latest_version.get("time", ""),
-            release_time=latest_version.get("releaseTime", "")
+        mc_versions = [
+            MCVersion(
+                id=entry.get("id", ""),
+                type=entry.get("type", ""),
+                url=entry.get("url", ""),
+                time=entry.get("time", ""),
+                release_time=entry.get("releaseTime", ""),
+                sha1=entry.get("sha1", "")
+            )
+            for entry in new_entries
+        ]
+        await asyncio.gather(
+            self._fetch_version_contents(mc_versions),
+            self.metadata.prefetch(new_entries)
         )
-
-        self.storage.set_last_notified_version(latest_id)
+        for mc_version in mc_versions:
+            mc_version.metadata = self.metadata.get(mc_version.id, mc_version.sha1)
+        message = MCNewsFormatter.format_version_batch(mc_versions)
+
+        notification_id = "version:" + "+".join(v.id for v in mc_versions)
+        # The push must be shared and on disk before the versions count as handled.
+        await self._enqueue(notification_id, message)
+        self.storage.add_known_versions(head_ids)
+        for mc_version in mc_versions:
+            self.storage.add_notified_version(mc_version.id)
+        self.storage.set_last_notified_version(versions[0].get("id", ""))
         self.storage.save()
 
-        content = await MCNewsFetcher.fetch_article_content(mc_version.article_url)
-        mc_version.content = content
-        message = MCNewsFormatter.format_version_push(mc_version)
-        await self._send_to_whitelist(message)
-        logger.info(f"MCNews: Pushed version: {mc_version.id}")
+        await self._flush_outbox(notification_id)
+        logger.info(f"MCNews: Pushed versions: {', '.join(v.id for v in mc_versions)}")
+
+    async def _fetch_version_contents(self, mc_versions: List[MCVersion]):
+        semaphore = asyncio.Semaphore(ARTICLE_FETCH_CONCURRENCY)
+
+        async def fetch(mc_version: MCVersion):
+            async with semaphore:
+                content = await self.patch_notes.get_content(mc_version.id)
+                if content is None:
+                    content, full = await self.fetcher.fetch_article_full(mc_version.article_url)
+                    if full.has_items:
+                        await self.changelog.save(mc_version.id, full)
+                mc_version.content = content
+
+        await asyncio.gather(*(fetch(mc_version) for mc_version in mc_versions))
 
     @filter.command_group("mcnews", description="Minecraft Java版本更新与Mojang服务状态监控")
     def mcnews(self):
@@ -172,14 +832,18 @@ class Main(star.Star):
 
     @mcnews.command("status", description="查看Mojang服务状态")
     async def cmd_status(self, event: AstrMessageEvent):
-        yield event.plain_result("Checking Mojang service status...")
-        services = await MCNewsFetcher.fetch_all_services_status()
-        message = MCNewsFormatter.format_services_status_all(services)
+        if self.is_leader and not self.status_cache.fresh():
+            yield event.plain_result("Checking Mojang service status...")
+        services, updated = await self.status_cache.get()
+        summaries = {
+            service.name: self.service_history.summary(service.name) for service in services or []
+        }
+        message = MCNewsFormatter.format_services_status_all(services or [], updated, summaries)
         yield event.plain_result(message)
 
     @mcnews.command("latest", description="查看最新MC版本")
     async def cmd_latest(self, event: AstrMessageEvent):
-        version_data = await MCNewsFetcher.fetch_versions()
+        version_data, updated = await self.latest_cache.get()
 
         if not version_data:
             yield event.plain_result("Failed to get version info.")
@@ -188,7 +852,135 @@ class Main(star.Star):
         latest = version_data.get("latest", {})
         versions = version_data.get("versions", [])
 
-        message = MCNewsFormatter.format_latest_versions(latest, versions)
+        message = MCNewsFormatter.format_latest_versions(latest, versions, updated)
+        yield event.plain_result(message)
+
+    @mcnews.command("version", description="查询指定MC版本信息")
+    async def cmd_version(self, event: AstrMessageEvent, version_id: str = ""):
+        index = self.fetcher.version_index
+        if not index:
+            yield event.plain_result("Version index is not ready yet, please try again later.")
+            return
+        if not version_id:
+            yield event.plain_result("Usage: /mcnews version <id>")
+            return
+
+        entry = index.get(version_id)
+        if entry is None:
+            yield event.plain_result(f"Version not found: {version_id}")
+            return
+
+        message = MCNewsFormatter.format_version_detail(
+            entry,
+            index.previous(version_id),
+            index.next(version_id)
+        )
+        yield event.plain_result(message)
+
+    @mcnews.command("details", description="查看指定MC版本的技术信息")
+    async def cmd_details(self, event: AstrMessageEvent, version_id: str = ""):
+        if not version_id:
+            yield event.plain_result("Usage: /mcnews details <id>")
+            return
+
+        entry = self.fetcher.version_index.get(version_id)
+        if entry is None:
+            yield event.plain_result(f"Version not found: {version_id}")
+            return
+
+        metadata = self.metadata.get(entry.id, entry.sha1)
+        if metadata is None:
+            yield event.plain_result(f"Details for {version_id} are not cached yet.")
+            return
+
+        yield event.plain_result(MCNewsFormatter.format_version_metadata(entry, metadata))
+
+    @mcnews.command("notes", description="分页查看指定版本的完整更新日志")
+    async def cmd_notes(self, event: AstrMessageEvent, version_id: str = "", section: str = "", page: int = 1):
+        if not version_id:
+            yield event.plain_result("Usage: /mcnews notes <id> [features|changes|bugs|technical] [page]")
+            return
+
+        if not section:
+            counts = await self.changelog.section_counts(version_id)
+            if counts is None:
+                yield event.plain_result(f"No changelog stored for {version_id}.")
+                return
+            yield event.plain_result(MCNewsFormatter.format_changelog_summary(version_id, counts))
+            return
+
+        field_name = CHANGELOG_SECTIONS.get(section)
+        if field_name is None:
+            yield event.plain_result(f"Unknown section: {section}\nAvailable: {', '.join(CHANGELOG_SECTIONS)}")
+            return
+
+        result = await self.changelog.page(version_id, field_name, page)
+        if result is None:
+            yield event.plain_result(f"No changelog stored for {version_id}.")
+            return
+        items, page, pages = result
+        yield event.plain_result(
+            MCNewsFormatter.format_changelog_page(version_id, section, items, page, pages)
+        )
+
+    @mcnews.command("history", description="查看MC版本历史")
+    async def cmd_history(self, event: AstrMessageEvent, version_type: str = "release", count: int = 10):
+        index = self.fetcher.version_index
+        if not index:
+            yield event.plain_result("Version index is not ready yet, please try again later.")
+            return
+
+        version_type = None if version_type == "all" else version_type
+        if version_type is not None and version_type not in index.types():
+            types = ", ".join(["all"] + index.types())
+            yield event.plain_result(f"Unknown version type: {version_type}\nAvailable: {types}")
+            return
+
+        count = max(1, min(count, HISTORY_MAX_COUNT))
+        message = MCNewsFormatter.format_version_history(index.history(version_type, count), version_type)
+        yield event.plain_result(message)
+
+    @mcnews.command("search", description="在已保存的更新日志中搜索关键词或MC漏洞编号")
+    async def cmd_search(self, event: AstrMessageEvent, query: str = ""):
+        if not query:
+            yield event.plain_result("Usage: /mcnews search <keyword|MC-id>")
+            return
+
+        results = await self.search.search(query, self.fetcher.version_index)
+        snippets = {}
+        for version_id, _ in results[:SEARCH_SNIPPETS]:
+            snippet = await self.search.snippet(version_id, query)
+            if snippet:
+                snippets[version_id] = snippet
+
+        yield event.plain_result(MCNewsFormatter.format_search_results(query, results, snippets))
+
+    @mcnews.command("stats", description="查看抓取、解析、存储与推送的耗时统计")
+    async def cmd_stats(self, event: AstrMessageEvent, action: str = ""):
+        if action == "profile":
+            if self.profiler.running:
+                yield event.plain_result("A profiled check cycle is already running.")
+                return
+            yield event.plain_result("Profiling one check cycle...")
+            try:
+                top = await self.profiler.run(self._profiled_cycle)
+            except (RuntimeError, ValueError, OSError) as e:
+                yield event.plain_result(f"Profiling failed: {e}")
+                return
+            yield event.plain_result(
+                MCNewsFormatter.format_profile(top, self.profiler.elapsed, self.profiler.path)
+            )
+            return
+        if action:
+            yield event.plain_result("Usage: /mcnews stats [profile]")
+            return
+
+        runtime = self._collect_runtime_metrics()
+        yield event.plain_result(MCNewsFormatter.format_stats(self.metrics, runtime))
+
+    @mcnews.command("digest", description="预览下一次定时摘要")
+    async def cmd_digest(self, event: AstrMessageEvent):
+        message = await self._build_digest(self.storage.get_digest_state(), dict(self.coalescer.collapsed))
         yield event.plain_result(message)
 
     @mcnews.command("add", description="将当前会话添加到推送白名单")
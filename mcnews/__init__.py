@@ -1,14 +1,59 @@
-from .models import MCVersion, MojangServiceStatus, MCVersionContent
+from .models import MCVersion, MojangServiceStatus, MCVersionContent, DeliveryReport, VersionEntry, VersionMetadata, LatencySummary, ServiceChange
 from .fetcher import MCNewsFetcher
 from .formatter import MCNewsFormatter
 from .storage import DataStorage
+from .sqlite_storage import SQLiteStorage
+from .manifest import ManifestHeadParser
+from .version_index import VersionIndex, VersionIndexStore
+from .metadata import VersionMetadataCache
+from .patch_notes import PatchNotesEngine, PatchNotesMirror
+from .changelog import ChangelogStore
+from .search import ChangelogSearchIndex
+from .executor import CPUExecutor, LoopLagMonitor
+from .delivery import DeliveryEngine, TokenBucket
+from .outbox import DeliveryOutbox
+from .latency import LatencyRing, ServiceHistory
+from .probe import ServiceStateTracker
+from .registry import ServiceRegistry
+from .scheduling import PollingPolicy, ReleaseWindowModel
+from .metrics import MetricsRegistry, Histogram, CycleProfiler
+from .coalesce import NotificationCoalescer
 from .constants import *
 
 __all__ = [
     'MCVersion', 
     'MojangServiceStatus',
     'MCVersionContent',
+    'DeliveryReport',
+    'VersionEntry',
+    'VersionMetadata',
+    'LatencySummary',
+    'ServiceChange',
     'MCNewsFetcher',
     'MCNewsFormatter',
     'DataStorage',
+    'SQLiteStorage',
+    'ManifestHeadParser',
+    'VersionIndex',
+    'VersionIndexStore',
+    'VersionMetadataCache',
+    'PatchNotesEngine',
+    'PatchNotesMirror',
+    'ChangelogStore',
+    'ChangelogSearchIndex',
+    'CPUExecutor',
+    'LoopLagMonitor',
+    'DeliveryEngine',
+    'TokenBucket',
+    'DeliveryOutbox',
+    'LatencyRing',
+    'ServiceHistory',
+    'ServiceStateTracker',
+    'ServiceRegistry',
+    'PollingPolicy',
+    'ReleaseWindowModel',
+    'MetricsRegistry',
+    'Histogram',
+    'CycleProfiler',
+    'NotificationCoalescer',
 ]
@@ -0,0 +1,40 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+
+class SnapshotCache:
+
+    def __init__(self, loader: Callable[[], Awaitable[Tuple[Any, Optional[float]]]], ttl: float):
+        self._loader = loader
+        self.ttl = ttl
+        self._value: Any = None
+        self._updated: Optional[float] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, value: Any, updated: Optional[float] = None):
+        if value:
+            self._value = value
+            self._updated = time.time() if updated is None else updated
+
+    def fresh(self) -> bool:
+        return self._updated is not None and time.time() - self._updated < self.ttl
+
+    async def _load(self) -> Tuple[Any, Optional[float]]:
+        try:
+            value, updated = await self._loader()
+            self.put(value, updated)
+            return self._value, self._updated
+        finally:
+            self._inflight = None
+
+    async def get(self) -> Tuple[Any, Optional[float]]:
+        if self.fresh():
+            self.hits += 1
+            return self._value, self._updated
+        self.misses += 1
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._load())
+        return await asyncio.shield(self._inflight)
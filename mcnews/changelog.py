@@ -0,0 +1,94 @@
+import os
+import re
+import gzip
+import json
+import asyncio
+from dataclasses import asdict
+from typing import AbstractSet, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .models import MCVersionContent
+from .constants import CHANGELOG_DIR, NOTES_PAGE_SIZE
+
+_UNSAFE_RE = re.compile(r'[^A-Za-z0-9._-]')
+
+
+class ChangelogStore:
+
+    def __init__(self, data_dir: str):
+        self.changelog_dir = os.path.join(data_dir, CHANGELOG_DIR)
+        os.makedirs(self.changelog_dir, exist_ok=True)
+        self.on_save: Optional[Callable[[str, MCVersionContent], Awaitable[None]]] = None
+
+    @staticmethod
+    def file_key(version_id: str) -> str:
+        return _UNSAFE_RE.sub('_', version_id)
+
+    def _path(self, version_id: str) -> str:
+        return os.path.join(self.changelog_dir, f"{ChangelogStore.file_key(version_id)}.json.gz")
+
+    def has(self, version_id: str) -> bool:
+        return os.path.exists(self._path(version_id))
+
+    def _write(self, version_id: str, content: MCVersionContent):
+        path = self._path(version_id)
+        tmp_path = path + ".tmp"
+        payload = json.dumps(
+            {"id": version_id, **asdict(content)},
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=9) as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def _read_file(self, path: str) -> Optional[Tuple[str, MCVersionContent]]:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            version_id = data.pop("id", "")
+            return version_id, MCVersionContent(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _read(self, version_id: str) -> Optional[MCVersionContent]:
+        result = self._read_file(self._path(version_id))
+        return result[1] if result else None
+
+    def iter_stored(self, skip: AbstractSet[str] = frozenset()):
+        for name in sorted(os.listdir(self.changelog_dir)):
+            if name.endswith(".json.gz") and name[:-len(".json.gz")] not in skip:
+                result = self._read_file(os.path.join(self.changelog_dir, name))
+                if result and result[0]:
+                    yield result
+
+    async def save(self, version_id: str, content: MCVersionContent):
+        await asyncio.get_running_loop().run_in_executor(None, self._write, version_id, content)
+        if self.on_save is not None:
+            await self.on_save(version_id, content)
+
+    async def load(self, version_id: str) -> Optional[MCVersionContent]:
+        if not self.has(version_id):
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, self._read, version_id)
+
+    async def section_counts(self, version_id: str) -> Optional[Dict[str, int]]:
+        content = await self.load(version_id)
+        if content is None:
+            return None
+        return {section: len(items) for section, items in asdict(content).items()}
+
+    async def page(
+        self,
+        version_id: str,
+        section: str,
+        page: int,
+        page_size: int = NOTES_PAGE_SIZE
+    ) -> Optional[Tuple[List[str], int, int]]:
+        content = await self.load(version_id)
+        if content is None:
+            return None
+        items = getattr(content, section)
+        pages = max(1, (len(items) + page_size - 1) // page_size)
+        page = min(max(1, page), pages)
+        start = (page - 1) * page_size
+        return items[start:start + page_size], page, pages
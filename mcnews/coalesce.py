@@ -0,0 +1,87 @@
+import time
+import asyncio
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .models import ServiceChange
+
+
+class NotificationCoalescer:
+
+    def __init__(self, flush: Callable[[List[ServiceChange]], Awaitable[Any]], window: float = 0.0):
+        self.window = window
+        self.collapsed: Dict[str, int] = {}
+        self.flaps = 0
+        self._flush = flush
+        self._pending: Dict[str, ServiceChange] = {}
+        self._opened: Optional[float] = None
+        self._timer: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def load(self, data: Dict[str, Any]):
+        self.collapsed.update(data.get("collapsed", {}))
+        try:
+            changes = [ServiceChange(**change) for change in data.get("changes", [])]
+        except TypeError:
+            return
+        for change in changes:
+            self._pending[change.name] = change
+        if self._pending:
+            self._opened = data.get("opened") or min(change.detected for change in changes)
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "opened": self._opened,
+            "changes": [asdict(change) for change in self._pending.values()],
+            "collapsed": dict(self.collapsed)
+        }
+
+    def add(self, change: ServiceChange):
+        change.detected = change.detected or time.time()
+        previous = self._pending.pop(change.name, None)
+        if previous is not None and previous.online != change.online:
+            # Nobody has been told about the first change yet, so a flap that
+            # returns to the old state inside the window cancels out.
+            self.collapsed[change.name] = self.collapsed.get(change.name, 0) + 1
+            self.flaps += 1
+            if not self._pending:
+                self._opened = None
+            return
+        self._pending[change.name] = change
+        if self._opened is None:
+            self._opened = change.detected
+
+    async def commit(self):
+        if not self._pending:
+            return
+        delay = self._opened + self.window - time.time()
+        if delay <= 0:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later(delay))
+
+    async def _flush_later(self, delay: float):
+        await asyncio.sleep(delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        changes = list(self._pending.values())
+        self._pending.clear()
+        self._opened = None
+        if changes:
+            await self._flush(changes)
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def pop_collapsed(self) -> Dict[str, int]:
+        collapsed, self.collapsed = self.collapsed, {}
+        return collapsed
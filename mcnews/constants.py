@@ -2,6 +2,49 @@ PLUGIN_NAME = "astrbot_plugin_mcnews"
 
 MC_VERSION_MANIFEST = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
 
+MANIFEST_HEAD_SIZE = 20
+
+JAVA_PATCH_NOTES = "https://launchercontent.mojang.com/v2/javaPatchNotes.json"
+
+PATCH_NOTES_BASE = "https://launchercontent.mojang.com/v2/"
+
+PATCH_NOTES_DIR = "mcnews_patch_notes_v2"
+
+PATCH_NOTES_SYNC_INTERVAL = 60
+
+CHANGELOG_DIR = "mcnews_changelogs"
+
+NOTES_PAGE_SIZE = 15
+
+SEARCH_INDEX_FILE = "mcnews_search.idx"
+
+SEARCH_MAX_RESULTS = 10
+
+SEARCH_SNIPPETS = 3
+
+SEARCH_SNIPPET_LENGTH = 120
+
+CHANGELOG_SECTIONS = {
+    "features": "new_features",
+    "changes": "changes",
+    "bugs": "bug_fixes",
+    "technical": "technical_changes",
+}
+
+MANIFEST_CHUNK_SIZE = 16384
+
+KNOWN_VERSIONS_KEEP = 200
+
+ARTICLE_FETCH_CONCURRENCY = 3
+
+HISTORY_MAX_COUNT = 30
+
+METADATA_CACHE_DIR = "mcnews_version_meta"
+
+METADATA_FETCH_CONCURRENCY = 4
+
+METADATA_SUMMARY_CACHE_SIZE = 256
+
 MOJANG_SERVICES = [
     {
         "name": "Mojang Session Server",
@@ -27,5 +70,113 @@ HTTP_HEADERS = {
 
 REQUEST_TIMEOUT = 30
 
+SERVICE_TIMEOUT = 10
+
+PROBE_BODY_DRAIN_LIMIT = 16384
+
+PROBE_CONCURRENCY = 16
+
+PROBE_STAGGER_WINDOW = 10
+
+SLP_DEFAULT_PORT = 25565
+
+SLP_PROTOCOL_VERSION = -1
+
+SLP_MAX_RESPONSE = 1 << 21
+
+SERVICE_STATE_THRESHOLD = 2
+
+LATENCY_RING_CAPACITY = 10080
+
+LATENCY_WINDOWS = {"1h": 3600, "24h": 86400, "7d": 604800}
+
+LATENCY_PERSIST_INTERVAL = 900
+
+HTTP_POOL_LIMIT = 32
+
+HTTP_POOL_LIMIT_PER_HOST = 4
+
+HTTP_DNS_CACHE_TTL = 300
+
+HTTP_KEEPALIVE_TIMEOUT = 60
+
+CPU_EXECUTOR_MODES = ("inline", "thread", "process")
+
+CPU_EXECUTOR_WORKERS = 2
+
+CPU_OFFLOAD_THRESHOLD = 64 * 1024
+
+LOOP_LAG_INTERVAL = 0.5
+
+LOOP_LAG_WARN_MS = 100
+
+DELIVERY_CONCURRENCY = 8
+
+DELIVERY_RATE_LIMIT = 5.0
+
+STATUS_CACHE_TTL = 300
+
+LATEST_CACHE_TTL = 900
+
+OUTBOX_RETRY_INTERVAL = 30
+
+OUTBOX_RETRY_BASE = 30
+
+OUTBOX_RETRY_MAX = 3600
+
+OUTBOX_MAX_ATTEMPTS = 8
+
+OUTBOX_DELIVERED_KEEP = 2000
+
+STORAGE_FLUSH_DELAY = 1.0
+
+STORAGE_JOURNAL_COMPACT_RATIO = 4
+
+STORAGE_RECENT_KEEP = 100
+
+SQLITE_HISTORY_DAYS = 90
+
+SQLITE_PRUNE_INTERVAL = 3600
+
+SCHEDULE_RECONCILE_INTERVAL = 60
+
+RELEASE_WINDOW_SAMPLE = 150
+
+RELEASE_WINDOW_MIN_SAMPLES = 20
+
+RELEASE_WINDOW_MIN_SHARE = 0.04
+
+SERVICE_STABLE_STEP = 6
+
+SERVICE_BACKOFF_MAX_STEPS = 4
+
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_EXPORT_INTERVAL = 60
+
+STATS_MAX_ROWS = 10
+
+PROFILE_FILE = "mcnews_profile.txt"
+
+PROFILE_TOP_N = 10
+
+PROFILE_REPORT_LINES = 40
+
+COORDINATION_DB = "mcnews_coordination.db"
+
+COORDINATION_INTERVAL = 10
+
+COORDINATION_LEASE_TTL = 30
+
+COORDINATION_BUSY_TIMEOUT = 5.0
+
+COORDINATION_FEED_KEEP = 86400
+
+NOTIFY_COALESCE_WINDOW = 0
+
+DIGEST_PERIOD = 86400
+
+DIGEST_MAX_VERSIONS = 10
+
 
 REQUEST_TIMEOUT = 30
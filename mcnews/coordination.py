@@ -0,0 +1,200 @@
+import os
+import re
+import json
+import time
+import socket
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from .constants import (
+    COORDINATION_DB,
+    COORDINATION_LEASE_TTL,
+    COORDINATION_BUSY_TIMEOUT,
+    COORDINATION_FEED_KEEP
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lease (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires REAL NOT NULL,
+    term INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feed (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    notification_id TEXT NOT NULL UNIQUE,
+    message TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feed_created ON feed(created);
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+_LEASE_NAME = "poller"
+
+_UNSAFE_RE = re.compile(r'[^A-Za-z0-9._-]')
+
+
+def default_instance() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def instance_filename(filename: str, instance: str) -> str:
+    root, ext = os.path.splitext(filename)
+    return f"{root}_{_UNSAFE_RE.sub('_', instance)}{ext}"
+
+
+class LeaseCoordinator:
+
+    def __init__(
+        self,
+        data_dir: str,
+        instance: str,
+        ttl: float = COORDINATION_LEASE_TTL,
+        filename: str = COORDINATION_DB
+    ):
+        self.path = os.path.join(data_dir, filename)
+        self.instance = instance
+        self.ttl = ttl
+        self.holder = ""
+        self.term = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcnews-lease")
+
+    @property
+    def leader(self) -> bool:
+        return self.holder == self.instance
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=COORDINATION_BUSY_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _transaction(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn = self._connect()
+        # IMMEDIATE takes the write lock up front, so two instances can never
+        # both read an expired lease and both claim it.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def _acquire(self, now: float) -> Tuple[str, int]:
+        def claim(conn: sqlite3.Connection) -> Tuple[str, int]:
+            row = conn.execute(
+                "SELECT holder, expires, term FROM lease WHERE name = ?", (_LEASE_NAME,)
+            ).fetchone()
+            holder, expires, term = row if row else ("", 0.0, 0)
+            if holder != self.instance and expires > now:
+                return holder, term
+            if holder != self.instance:
+                term += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO lease (name, holder, expires, term) VALUES (?, ?, ?, ?)",
+                (_LEASE_NAME, self.instance, now + self.ttl, term)
+            )
+            return self.instance, term
+        return self._transaction(claim)
+
+    def _release(self):
+        def release(conn: sqlite3.Connection):
+            conn.execute(
+                "UPDATE lease SET expires = 0 WHERE name = ? AND holder = ?",
+                (_LEASE_NAME, self.instance)
+            )
+        self._transaction(release)
+
+    def _publish(self, notification_id: str, message: str, now: float) -> int:
+        def publish(conn: sqlite3.Connection) -> int:
+            conn.execute(
+                "INSERT OR IGNORE INTO feed (notification_id, message, created) VALUES (?, ?, ?)",
+                (notification_id, message, now)
+            )
+            conn.execute("DELETE FROM feed WHERE created < ?", (now - COORDINATION_FEED_KEEP,))
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM feed").fetchone()[0]
+        return self._transaction(publish)
+
+    def _read_feed(self, after: int) -> List[Tuple[int, str, str]]:
+        return self._connect().execute(
+            "SELECT seq, notification_id, message FROM feed WHERE seq > ? ORDER BY seq",
+            (after,)
+        ).fetchall()
+
+    def _latest_seq(self) -> int:
+        return self._connect().execute("SELECT COALESCE(MAX(seq), 0) FROM feed").fetchone()[0]
+
+    def _put_snapshot(self, key: str, value: Any, now: float):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO snapshots (key, value, updated) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False, separators=(",", ":")), now)
+        )
+
+    def _snapshot_updated(self, key: str) -> Optional[float]:
+        row = self._connect().execute(
+            "SELECT updated FROM snapshots WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _get_snapshot(self, key: str) -> Tuple[Any, Optional[float]]:
+        row = self._connect().execute(
+            "SELECT value, updated FROM snapshots WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None, None
+        return json.loads(row[0]), row[1]
+
+    async def acquire(self) -> bool:
+        self.holder, self.term = await self._run(self._acquire, time.time())
+        return self.leader
+
+    async def publish(self, notification_id: str, message: str) -> int:
+        return await self._run(self._publish, notification_id, message, time.time())
+
+    async def read_feed(self, after: int) -> List[Tuple[int, str, str]]:
+        return await self._run(self._read_feed, after)
+
+    async def latest_seq(self) -> int:
+        return await self._run(self._latest_seq)
+
+    async def put_snapshot(self, key: str, value: Any):
+        await self._run(self._put_snapshot, key, value, time.time())
+
+    async def snapshot_updated(self, key: str) -> Optional[float]:
+        return await self._run(self._snapshot_updated, key)
+
+    async def get_snapshot(self, key: str) -> Tuple[Any, Optional[float]]:
+        return await self._run(self._get_snapshot, key)
+
+    async def close(self):
+        if self.leader:
+            try:
+                await self._run(self._release)
+            except sqlite3.Error:
+                pass
+        self.holder = ""
+        if self._conn is not None:
+            conn = self._conn
+            self._conn = None
+            await self._run(conn.close)
+        self._executor.shutdown(wait=True)
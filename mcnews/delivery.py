@@ -0,0 +1,94 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .models import DeliveryReport
+from .metrics import MetricsRegistry
+from .constants import DELIVERY_CONCURRENCY, DELIVERY_RATE_LIMIT
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            # Sleeping outside the lock lets other senders take a token as
+            # soon as one frees up instead of queueing behind this one.
+            await asyncio.sleep(wait)
+
+
+class DeliveryEngine:
+
+    def __init__(
+        self,
+        send: Callable[[str, str], Awaitable[None]],
+        concurrency: int = DELIVERY_CONCURRENCY,
+        rate: float = DELIVERY_RATE_LIMIT,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        self._send = send
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.metrics = metrics or MetricsRegistry()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @staticmethod
+    def platform_of(session: str) -> str:
+        return session.split(":", 1)[0]
+
+    def _bucket(self, session: str) -> TokenBucket:
+        platform = DeliveryEngine.platform_of(session)
+        bucket = self._buckets.get(platform)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, max(1.0, self.rate))
+            self._buckets[platform] = bucket
+        return bucket
+
+    async def deliver(
+        self,
+        sessions: List[str],
+        message: str,
+        on_result: Optional[Callable[[str, Optional[str]], None]] = None
+    ) -> DeliveryReport:
+        report = DeliveryReport(total=len(sessions))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.monotonic()
+
+        async def deliver_one(session: str):
+            async with semaphore:
+                if self.rate > 0:
+                    await self._bucket(session).acquire()
+                error = None
+                sent_at = time.perf_counter()
+                try:
+                    await self._send(session, message)
+                    report.sent += 1
+                except Exception as e:
+                    error = str(e)[:100]
+                    report.failed[session] = error
+                self.metrics.record(
+                    "mcnews_send",
+                    time.perf_counter() - sent_at,
+                    "ok" if error is None else "error",
+                    platform=DeliveryEngine.platform_of(session)
+                )
+                if on_result is not None:
+                    on_result(session, error)
+
+        await asyncio.gather(*(deliver_one(session) for session in sessions))
+        report.elapsed = time.monotonic() - start
+        return report
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from astrbot.api import logger
+
+from .constants import (
+    CPU_EXECUTOR_MODES,
+    CPU_EXECUTOR_WORKERS,
+    CPU_OFFLOAD_THRESHOLD,
+    LOOP_LAG_INTERVAL,
+    LOOP_LAG_WARN_MS
+)
+
+
+class CPUExecutor:
+
+    def __init__(
+        self,
+        mode: str = "inline",
+        threshold: int = CPU_OFFLOAD_THRESHOLD,
+        max_workers: int = CPU_EXECUTOR_WORKERS
+    ):
+        if mode not in CPU_EXECUTOR_MODES:
+            logger.warning(f"MCNews: Unknown executor mode {mode!r}, falling back to inline")
+            mode = "inline"
+        self.mode = mode
+        self.threshold = threshold
+        self.max_workers = max_workers
+        self._pool: Optional[Executor] = None
+        self.offloaded = 0
+        self.inlined = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="mcnews-cpu"
+                )
+        return self._pool
+
+    async def run(self, size: int, func: Callable[..., Any], *args) -> Any:
+        if self.mode == "inline" or size < self.threshold:
+            self.inlined += 1
+            return func(*args)
+        self.offloaded += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), func, *args)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class LoopLagMonitor:
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, warn_ms: float = LOOP_LAG_WARN_MS):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self.samples = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.stalls = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.monotonic() - expected) * 1000)
+            self.samples += 1
+            self.total_ms += lag_ms
+            self.last_ms = lag_ms
+            self.max_ms = max(self.max_ms, lag_ms)
+            if lag_ms >= self.warn_ms:
+                self.stalls += 1
+                logger.warning(f"MCNews: Event loop stalled for {lag_ms:.0f}ms")
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "samples": self.samples,
+            "avg_ms": self.total_ms / self.samples if self.samples else 0.0,
+            "max_ms": self.max_ms,
+            "last_ms": self.last_ms,
+            "stalls": self.stalls,
+        }
@@ -1,162 +1,561 @@
-import time
 import asyncio
 import re
+import json
+import time
+import html as html_module
 import aiohttp
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+from astrbot.api import logger
 
 from .models import MojangServiceStatus, MCVersionContent
+from .storage import DataStorage
+from .manifest import ManifestHeadParser
+from .executor import CPUExecutor
+from .metrics import MetricsRegistry
+from .version_index import VersionIndex, VersionIndexStore
+from .probe import ProbeTimings, create_probe_trace_config
+from .registry import run_staggered
+from .slp import server_list_ping, describe
 from .constants import (
     MC_VERSION_MANIFEST,
+    MANIFEST_HEAD_SIZE,
+    MANIFEST_CHUNK_SIZE,
     MOJANG_SERVICES,
     HTTP_HEADERS,
-    REQUEST_TIMEOUT
+    REQUEST_TIMEOUT,
+    SERVICE_TIMEOUT,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    PROBE_BODY_DRAIN_LIMIT,
+    PROBE_CONCURRENCY
+)
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+_MC_ID_RE = re.compile(r'(MC-\d+)')
+_FIXED_BUGS_RE = re.compile(r'Fixed bugs', re.IGNORECASE)
+_ARTICLE_TOKEN_RE = re.compile(
+    r'<h(?P<level>[1-6])[^>]*>(?P<heading>[^<]*(?:<(?!/?h[1-6])[^<]*)*)</h(?P=level)>'
+    r'|<h(?P<open>[1-6])'
+    r'|<li[^>]*>(?P<item>[^<]*(?:<(?!h[1-6]|/li>)[^<]*)*)</li>'
 )
 
+_SECTION_HEADINGS = {
+    "New Features": "new_features",
+    "Changes": "changes",
+    "Technical Changes": "technical_changes",
+}
+
+_SECTION_LIMITS = {
+    "new_features": 10,
+    "changes": 10,
+    "bug_fixes": 15,
+    "technical_changes": 5,
+}
+
 
 class MCNewsFetcher:
 
+    def __init__(
+        self,
+        storage: Optional[DataStorage] = None,
+        executor: Optional[CPUExecutor] = None,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._storage = storage
+        self._executor = executor or CPUExecutor()
+        self.metrics = metrics or MetricsRegistry()
+        self._manifest_etag = ""
+        self._manifest_last_modified = ""
+        self._manifest_size = 0
+        self._manifest: Dict[str, Any] = {}
+        self._manifest_complete = False
+        self.manifest_updated: Optional[float] = None
+        self.restore_manifest_cache()
+        self._version_index: Optional[VersionIndex] = None
+        self._index_validators = ("", "")
+        self._index_store: Optional[VersionIndexStore] = None
+        self.manifest_stats: Dict[str, int] = {"hits": 0, "misses": 0, "bytes_saved": 0}
+        self.probe_stats: Dict[str, int] = {"reused": 0, "new": 0}
+
+    def restore_manifest_cache(self):
+        cache = self._storage.get_manifest_cache() if self._storage is not None else {}
+        self._manifest_etag = cache.get("etag", "")
+        self._manifest_last_modified = cache.get("last_modified", "")
+        self._manifest_size = cache.get("size", 0)
+        self._manifest = cache.get("head", {})
+        self._manifest_complete = False
+        self.manifest_updated = cache.get("updated")
+
+    async def start(self):
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            use_dns_cache=True,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=HTTP_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            trace_configs=[create_probe_trace_config()]
+        )
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._index_store is not None:
+            await self._index_store.close()
+
+    def _get_index_store(self) -> Optional[VersionIndexStore]:
+        if self._index_store is None and self._storage is not None:
+            self._index_store = VersionIndexStore()
+        return self._index_store
+
+    @property
+    def version_index(self) -> VersionIndex:
+        # Restored on first use so loading the plugin does not pay for it.
+        if self._version_index is None:
+            self._version_index = VersionIndex()
+            store = self._get_index_store()
+            if store is not None and store.data.get("entries"):
+                self._restore_version_index(store.data)
+        return self._version_index
+
+    @version_index.setter
+    def version_index(self, index: VersionIndex):
+        self._version_index = index
+
+    def _restore_version_index(self, data: Dict[str, Any]):
+        try:
+            self.version_index = VersionIndex.load(data["entries"])
+        except (TypeError, ValueError) as e:
+            logger.warning(f"MCNews: Discarding cached version index: {e}")
+            return
+        self._index_validators = (data.get("etag", ""), data.get("last_modified", ""))
+
+    def _save_version_index(self):
+        store = self._get_index_store()
+        if store is None or self._storage.read_only:
+            return
+        store.data["etag"], store.data["last_modified"] = self._index_validators
+        store.data["entries"] = self.version_index.dump()
+        store.save()
+
+    @property
+    def manifest_head(self) -> Dict[str, Any]:
+        if self._manifest_complete:
+            return MCNewsFetcher._manifest_head(self._manifest)
+        return self._manifest
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
     @staticmethod
-    async def fetch_versions() -> Dict[str, Any]:
+    def _failure(endpoint: str, error: Exception) -> str:
+        if isinstance(error, asyncio.TimeoutError):
+            outcome = "timeout"
+        elif isinstance(error, (aiohttp.ClientError, OSError)):
+            outcome = "network_error"
+        elif isinstance(error, (ValueError, KeyError, TypeError)):
+            outcome = "parse_error"
+        else:
+            logger.warning(f"MCNews: Unexpected error fetching {endpoint}: {error!r}")
+            return "error"
+        logger.debug(f"MCNews: Fetching {endpoint} failed ({outcome}): {error!r}")
+        return outcome
+
+    def _record_fetch(self, endpoint: str, start: float, outcome: str):
+        self.metrics.record("mcnews_fetch", time.perf_counter() - start, outcome, endpoint=endpoint)
+
+    def _manifest_request_headers(self, complete: bool) -> Dict[str, str]:
+        headers = {}
+        if not self._manifest or (complete and not self._manifest_complete):
+            return headers
+        if self._manifest_etag:
+            headers["If-None-Match"] = self._manifest_etag
+        if self._manifest_last_modified:
+            headers["If-Modified-Since"] = self._manifest_last_modified
+        return headers
+
+    @staticmethod
+    def _manifest_head(data: Dict[str, Any]) -> Dict[str, Any]:
+        latest = data.get("latest", {})
+        wanted = {latest.get("release"), latest.get("snapshot")}
+        head = []
+        for version in data.get("versions", []):
+            head.append(version)
+            wanted.discard(version.get("id"))
+            if not wanted and len(head) >= MANIFEST_HEAD_SIZE:
+                break
+        return {"latest": latest, "versions": head}
+
+    def _remember_manifest(
+        self,
+        resp: aiohttp.ClientResponse,
+        data: Dict[str, Any],
+        size: int,
+        complete: bool
+    ):
+        self._manifest = data
+        self._manifest_complete = complete
+        self._manifest_size = size
+        self._manifest_etag = resp.headers.get("ETag", "")
+        self._manifest_last_modified = resp.headers.get("Last-Modified", "")
+        self.manifest_updated = time.time()
+        if self._storage is None:
+            return
+        self._storage.set_manifest_cache(
+            self._manifest_etag,
+            self._manifest_last_modified,
+            size,
+            MCNewsFetcher._manifest_head(data)
+        )
+        self._storage.save()
+
+    async def fetch_versions(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        outcome = "ok"
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    MC_VERSION_MANIFEST,
-                    headers=HTTP_HEADERS,
-                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
-                ) as resp:
-                    if resp.status != 200:
-                        return {}
-                    return await resp.json()
-        except Exception:
+            session = await self._get_session()
+            async with session.get(
+                MC_VERSION_MANIFEST,
+                headers=self._manifest_request_headers(complete=True)
+            ) as resp:
+                if resp.status == 304 and self._manifest:
+                    outcome = "not_modified"
+                    self.manifest_stats["hits"] += 1
+                    self.manifest_stats["bytes_saved"] += self._manifest_size
+                    return self._manifest
+                if resp.status != 200:
+                    outcome = "http_error"
+                    return {}
+                body = await resp.read()
+                with self.metrics.timer("mcnews_parse_seconds", kind="manifest"):
+                    data = await self._executor.run(len(body), json.loads, body)
+                self.manifest_stats["misses"] += 1
+                self._remember_manifest(resp, data, len(body), complete=True)
+                with self.metrics.timer("mcnews_parse_seconds", kind="version_index"):
+                    self.version_index = await self._executor.run(len(body), VersionIndex.build, data)
+                self._index_validators = (self._manifest_etag, self._manifest_last_modified)
+                self._save_version_index()
+                return data
+        except Exception as e:
+            outcome = MCNewsFetcher._failure("manifest", e)
             return {}
+        finally:
+            self._record_fetch("manifest", start, outcome)
 
-    @staticmethod
-    async def fetch_article_content(url: str) -> MCVersionContent:
+    def version_index_stale(self) -> bool:
+        if not self.version_index:
+            return True
+        if self._index_validators != (self._manifest_etag, self._manifest_last_modified):
+            return True
+        head = self._manifest.get("versions", [])
+        return bool(head) and head[0].get("id") not in self.version_index
+
+    async def refresh_version_index(self) -> VersionIndex:
+        if self.version_index_stale():
+            await self.fetch_versions()
+        return self.version_index
+
+    async def fetch_manifest_head(self, limit: int = MANIFEST_HEAD_SIZE) -> Dict[str, Any]:
+        start = time.perf_counter()
+        outcome = "ok"
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url,
-                    headers=HTTP_HEADERS,
-                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
-                ) as resp:
-                    if resp.status != 200:
-                        return MCVersionContent()
-                    html = await resp.text()
-                    return MCNewsFetcher._parse_article_html(html)
-        except Exception:
-            return MCVersionContent()
+            session = await self._get_session()
+            async with session.get(
+                MC_VERSION_MANIFEST,
+                headers=self._manifest_request_headers(complete=False)
+            ) as resp:
+                if resp.status == 304 and self._manifest:
+                    outcome = "not_modified"
+                    self.manifest_stats["hits"] += 1
+                    self.manifest_stats["bytes_saved"] += self._manifest_size
+                    return self.manifest_head
+                if resp.status != 200:
+                    outcome = "http_error"
+                    return {}
+                parser = ManifestHeadParser(limit)
+                async for chunk in resp.content.iter_chunked(MANIFEST_CHUNK_SIZE):
+                    if parser.feed(chunk):
+                        break
+                if not parser.close():
+                    outcome = "parse_error"
+                    return {}
+                if not resp.content.at_eof():
+                    resp.close()
+                self.manifest_stats["misses"] += 1
+                data = parser.result()
+                self._remember_manifest(
+                    resp,
+                    data,
+                    resp.content_length or self._manifest_size,
+                    complete=False
+                )
+                return data
+        except Exception as e:
+            outcome = MCNewsFetcher._failure("manifest_head", e)
+            return {}
+        finally:
+            self._record_fetch("manifest_head", start, outcome)
+
+    async def fetch_bytes(self, url: str, endpoint: str = "bytes") -> bytes:
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            session = await self._get_session()
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    outcome = "http_error"
+                    return b""
+                return await resp.read()
+        except Exception as e:
+            outcome = MCNewsFetcher._failure(endpoint, e)
+            return b""
+        finally:
+            self._record_fetch(endpoint, start, outcome)
+
+    async def fetch_conditional(
+        self,
+        url: str,
+        etag: str = "",
+        last_modified: str = "",
+        endpoint: str = "conditional"
+    ) -> Tuple[int, bytes, str, str]:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            session = await self._get_session()
+            async with session.get(url, headers=headers) as resp:
+                if resp.status == 304:
+                    outcome = "not_modified"
+                elif resp.status != 200:
+                    outcome = "http_error"
+                body = await resp.read() if resp.status == 200 else b""
+                return (
+                    resp.status,
+                    body,
+                    resp.headers.get("ETag", etag),
+                    resp.headers.get("Last-Modified", last_modified)
+                )
+        except Exception as e:
+            outcome = MCNewsFetcher._failure(endpoint, e)
+            return 0, b"", etag, last_modified
+        finally:
+            self._record_fetch(endpoint, start, outcome)
+
+    async def fetch_article_full(self, url: str) -> Tuple[MCVersionContent, MCVersionContent]:
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            session = await self._get_session()
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    outcome = "http_error"
+                    return MCVersionContent(), MCVersionContent()
+                html = await resp.text()
+                with self.metrics.timer("mcnews_parse_seconds", kind="article"):
+                    return await self._executor.run(
+                        len(html),
+                        MCNewsFetcher._parse_article_full,
+                        html
+                    )
+        except Exception as e:
+            outcome = MCNewsFetcher._failure("article", e)
+            return MCVersionContent(), MCVersionContent()
+        finally:
+            self._record_fetch("article", start, outcome)
 
     @staticmethod
     def _clean_text(text: str) -> str:
-        import html as html_module
-        text = re.sub(r'<[^>]+>', '', text).strip()
-        text = re.sub(r'\s+', ' ', text)
+        text = _TAG_RE.sub('', text).strip()
+        text = _WHITESPACE_RE.sub(' ', text)
         text = html_module.unescape(text)
         return text
 
+    @staticmethod
+    def _section_for_heading(heading: str) -> Optional[str]:
+        section = _SECTION_HEADINGS.get(heading)
+        if section is None and _FIXED_BUGS_RE.match(heading):
+            section = "bug_fixes"
+        return section
+
+    @staticmethod
+    def _clean_item(section: str, item: str) -> str:
+        text = MCNewsFetcher._clean_text(item)
+        if section == "bug_fixes":
+            mc_match = _MC_ID_RE.search(text)
+            if mc_match:
+                bug_id = mc_match.group(1)
+                desc = text.split(' - ', 1)[-1] if ' - ' in text else text
+                return f"{bug_id}: {desc}"
+        if text and len(text) > 3:
+            return text
+        return ""
+
+    @staticmethod
+    def _tokenize_sections(html_content: str, full: bool = False) -> Dict[str, List[str]]:
+        sections: Dict[str, List[str]] = {}
+        pending = set(_SECTION_LIMITS)
+        section = None
+        section_level = 0
+        items: List[str] = []
+
+        for match in _ARTICLE_TOKEN_RE.finditer(html_content):
+            kind = match.lastgroup
+            if kind == "item":
+                if section is not None and (full or len(items) < _SECTION_LIMITS[section]):
+                    items.append(match.group("item"))
+                continue
+
+            # Patch notes bodies use <h1> sections with <h2> sub-headings,
+            # article pages use <h2>; only a heading at the section's own
+            # level or above ends it.
+            level = int(match.group("level") or match.group("open"))
+            if section is not None:
+                if level > section_level:
+                    continue
+                sections[section] = items
+                if not pending:
+                    break
+            section = None
+            items = []
+
+            if kind == "heading":
+                heading = MCNewsFetcher._clean_text(match.group("heading"))
+                name = MCNewsFetcher._section_for_heading(heading)
+                if name in pending:
+                    pending.discard(name)
+                    section = name
+                    section_level = level
+
+        # The bug list is usually the last thing in a body, with no heading
+        # after it to close the section.
+        if section is not None:
+            sections[section] = items
+        return sections
+
     @staticmethod
     def _parse_article_html(html_content: str) -> MCVersionContent:
         content = MCVersionContent()
-        
-        features_match = re.search(
-            r'<h2[^>]*>New Features</h2>(.*?)(?=<h2)',
-            html_content, re.DOTALL
-        )
-        if features_match:
-            items = re.findall(r'<li[^>]*>(.*?)</li>', features_match.group(1), re.DOTALL)
-            for item in items[:10]:
-                text = MCNewsFetcher._clean_text(item)
-                if text and len(text) > 3:
-                    content.new_features.append(text)
-
-        changes_match = re.search(
-            r'<h2[^>]*>Changes</h2>(.*?)(?=<h2)',
-            html_content, re.DOTALL
-        )
-        if changes_match:
-            items = re.findall(r'<li[^>]*>(.*?)</li>', changes_match.group(1), re.DOTALL)
-            for item in items[:10]:
-                text = MCNewsFetcher._clean_text(item)
-                if text and len(text) > 3:
-                    content.changes.append(text)
-
-        bugs_match = re.search(
-            r'<h2[^>]*>Fixed bugs[^<]*</h2>(.*?)(?=<h2)',
-            html_content, re.DOTALL | re.IGNORECASE
-        )
-        if bugs_match:
-            items = re.findall(r'<li[^>]*>(.*?)</li>', bugs_match.group(1), re.DOTALL)
-            for item in items[:15]:
-                text = MCNewsFetcher._clean_text(item)
-                mc_match = re.search(r'(MC-\d+)', text)
-                if mc_match:
-                    bug_id = mc_match.group(1)
-                    desc = text.split(' - ', 1)[-1] if ' - ' in text else text
-                    content.bug_fixes.append(f"{bug_id}: {desc}")
-                elif text and len(text) > 3:
-                    content.bug_fixes.append(text)
-
-        tech_match = re.search(
-            r'<h2[^>]*>Technical Changes</h2>(.*?)(?=<h2)',
-            html_content, re.DOTALL
-        )
-        if tech_match:
-            items = re.findall(r'<li[^>]*>(.*?)</li>', tech_match.group(1), re.DOTALL)
-            for item in items[:5]:
-                text = MCNewsFetcher._clean_text(item)
-                if text and len(text) > 3:
-                    content.technical_changes.append(text)
-
+        for section, items in MCNewsFetcher._tokenize_sections(html_content).items():
+            target = getattr(content, section)
+            for item in items:
+                text = MCNewsFetcher._clean_item(section, item)
+                if text:
+                    target.append(text)
         return content
 
     @staticmethod
-    async def fetch_service_status(service: Dict[str, str]) -> MojangServiceStatus:
-        start_time = time.time()
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    service["url"],
-                    headers=HTTP_HEADERS,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as resp:
-                    latency = int((time.time() - start_time) * 1000)
-                    if resp.status == 200:
-                        return MojangServiceStatus(
-                            name=service["name"],
-                            url=service["url"],
-                            description=service["description"],
-                            online=True,
-                            latency=latency
-                        )
-                    else:
-                        return MojangServiceStatus(
-                            name=service["name"],
-                            url=service["url"],
-                            description=service["description"],
-                            online=False,
-                            latency=latency,
-                            error_message=f"HTTP {resp.status}"
-                        )
-        except asyncio.TimeoutError:
+    def _parse_article_full(html_content: str) -> Tuple[MCVersionContent, MCVersionContent]:
+        content = MCVersionContent()
+        full = MCVersionContent()
+        for section, items in MCNewsFetcher._tokenize_sections(html_content, full=True).items():
+            cleaned = [MCNewsFetcher._clean_item(section, item) for item in items]
+            getattr(content, section).extend(text for text in cleaned[:_SECTION_LIMITS[section]] if text)
+            getattr(full, section).extend(text for text in cleaned if text)
+        return content, full
+
+    async def _probe_http(self, service: Dict[str, Any]) -> MojangServiceStatus:
+        timings = ProbeTimings()
+        session = await self._get_session()
+        async with session.request(
+            service.get("method", "GET"),
+            service["url"],
+            timeout=aiohttp.ClientTimeout(total=SERVICE_TIMEOUT),
+            trace_request_ctx=timings
+        ) as resp:
+            timings.mark_headers()
+            # Small bodies are drained so the pooled connection can be reused;
+            # anything larger is dropped unread.
+            if resp.content_length is not None and resp.content_length <= PROBE_BODY_DRAIN_LIMIT:
+                await resp.read()
             return MojangServiceStatus(
                 name=service["name"],
                 url=service["url"],
                 description=service["description"],
-                online=False,
-                error_message="Timeout"
+                online=resp.status == 200,
+                latency=int(timings.total_ms),
+                error_message="" if resp.status == 200 else f"HTTP {resp.status}",
+                dns_ms=timings.dns_ms,
+                connect_ms=timings.connect_ms,
+                ttfb_ms=timings.ttfb_ms,
+                reused=timings.reused,
+                group=service.get("group", "mojang")
             )
+
+    async def _probe_slp(self, service: Dict[str, Any]) -> MojangServiceStatus:
+        result = await server_list_ping(service["host"], service["port"])
+        return MojangServiceStatus(
+            name=service["name"],
+            url=service["url"],
+            description=service["description"],
+            online=True,
+            latency=int(result["latency"]),
+            dns_ms=result["dns_ms"],
+            connect_ms=result["connect_ms"],
+            ttfb_ms=result["ttfb_ms"],
+            group=service.get("group", "custom"),
+            detail=describe(result["status"])
+        )
+
+    async def fetch_service_status(self, service: Dict[str, Any]) -> MojangServiceStatus:
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            if service.get("type") == "slp":
+                status = await asyncio.wait_for(self._probe_slp(service), SERVICE_TIMEOUT)
+            else:
+                status = await self._probe_http(service)
+                self.probe_stats["reused" if status.reused else "new"] += 1
+            if not status.online:
+                outcome = "http_error"
+            return status
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            error_message = "Timeout"
         except Exception as e:
-            return MojangServiceStatus(
-                name=service["name"],
-                url=service["url"],
-                description=service["description"],
-                online=False,
-                error_message=str(e)[:50]
+            outcome = MCNewsFetcher._failure(service["name"], e)
+            error_message = str(e)[:50] or type(e).__name__
+        finally:
+            self.metrics.record(
+                "mcnews_probe",
+                time.perf_counter() - start,
+                outcome,
+                service=service["name"]
             )
+        return MojangServiceStatus(
+            name=service["name"],
+            url=service["url"],
+            description=service["description"],
+            online=False,
+            error_message=error_message,
+            group=service.get("group", "mojang")
+        )
 
-    @staticmethod
-    async def fetch_all_services_status() -> List[MojangServiceStatus]:
-        tasks = [MCNewsFetcher.fetch_service_status(svc) for svc in MOJANG_SERVICES]
-        results = await asyncio.gather(*tasks)
-        return list(results)
+    async def fetch_all_services_status(
+        self,
+        services: Optional[List[Dict[str, Any]]] = None,
+        concurrency: int = PROBE_CONCURRENCY,
+        stagger: float = 0.0
+    ) -> List[MojangServiceStatus]:
+        if services is None:
+            services = MOJANG_SERVICES
+        return await run_staggered(services, self.fetch_service_status, concurrency, stagger)
 
@@ -1,11 +1,38 @@
+import time
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
-from .models import MCVersion, MojangServiceStatus
+from .models import MCVersion, MojangServiceStatus, VersionEntry, VersionMetadata, LatencySummary, ServiceChange
+from .metrics import MetricsRegistry
+from .constants import (
+    CHANGELOG_SECTIONS,
+    NOTES_PAGE_SIZE,
+    SEARCH_MAX_RESULTS,
+    SEARCH_SNIPPET_LENGTH,
+    STATS_MAX_ROWS,
+    DIGEST_MAX_VERSIONS
+)
+
+_STATS_SECTIONS = (
+    ("Fetch", "mcnews_fetch", "endpoint"),
+    ("Parse", "mcnews_parse", "kind"),
+    ("Service probes", "mcnews_probe", "service"),
+    ("Storage flush", "mcnews_storage_flush", "store"),
+    ("Sends", "mcnews_send", "platform"),
+    ("Check cycles", "mcnews_check", "job"),
+)
 
 
 class MCNewsFormatter:
 
+    @staticmethod
+    def format_updated(updated: Optional[float] = None) -> str:
+        if updated is None:
+            return f"Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        age = max(0, int(time.time() - updated))
+        timestamp = datetime.fromtimestamp(updated).strftime('%Y-%m-%d %H:%M:%S')
+        return f"Updated: {timestamp} ({age}s ago)"
+
     @staticmethod
     def format_version_push(version: MCVersion) -> str:
         lines = [
@@ -13,6 +40,8 @@ class MCNewsFormatter:
             f"类型: {version.display_type}",
             f"发布时间: {version.release_time[:10]}",
         ]
+        if version.metadata and version.metadata.java_version:
+            lines.append(f"Java版本: {version.metadata.java_version}")
         
         if version.content:
             if version.content.new_features:
@@ -44,7 +73,20 @@ class MCNewsFormatter:
         return "\n".join(lines)
 
     @staticmethod
-    def format_latest_versions(latest: dict, versions: list) -> str:
+    def format_version_batch(versions: List[MCVersion]) -> str:
+        if len(versions) == 1:
+            return MCNewsFormatter.format_version_push(versions[0])
+
+        ids = ", ".join(version.id for version in versions)
+        lines = [f"[MC版本更新] 共 {len(versions)} 个新版本: {ids}"]
+        for version in versions:
+            lines.append("")
+            lines.append("-" * 20)
+            lines.append(MCNewsFormatter.format_version_push(version))
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_latest_versions(latest: dict, versions: list, updated: Optional[float] = None) -> str:
         lines = ["[Minecraft Latest Versions]", ""]
         
         release_id = latest.get("release", "")
@@ -70,6 +112,103 @@ class MCNewsFormatter:
             lines.append(f"Snapshot: {snapshot_id}")
             lines.append(f"  Released: {snapshot_info.get('releaseTime', 'Unknown')[:10]}")
         
+        lines.append("")
+        lines.append(MCNewsFormatter.format_updated(updated))
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_version_detail(
+        entry: VersionEntry,
+        previous: Optional[VersionEntry] = None,
+        following: Optional[VersionEntry] = None
+    ) -> str:
+        version = entry.to_mc_version()
+        lines = [
+            f"[Minecraft Version] {entry.id}",
+            f"Type: {version.display_type}",
+            f"Released: {entry.release_time[:10]}",
+        ]
+        if previous:
+            lines.append(f"Previous {entry.type}: {previous.id}")
+        if following:
+            lines.append(f"Next {entry.type}: {following.id}")
+        lines.append(f"Article: {version.article_url}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_version_metadata(entry: VersionEntry, metadata: VersionMetadata) -> str:
+        lines = [
+            f"[Minecraft Version Details] {entry.id}",
+            f"Released: {entry.release_time[:10]}",
+        ]
+        if metadata.java_version:
+            java = f"Java {metadata.java_version}"
+            if metadata.java_component:
+                java += f" ({metadata.java_component})"
+            lines.append(f"Runtime: {java}")
+        if metadata.asset_index:
+            lines.append(f"Asset index: {metadata.asset_index}")
+        if metadata.main_class:
+            lines.append(f"Main class: {metadata.main_class}")
+        if metadata.compliance_level:
+            lines.append(f"Compliance level: {metadata.compliance_level}")
+        if metadata.client_size:
+            lines.append(f"Client jar: {metadata.client_size / 1024 / 1024:.1f} MB")
+        if metadata.server_size:
+            lines.append(f"Server jar: {metadata.server_size / 1024 / 1024:.1f} MB")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_changelog_summary(version_id: str, counts: Dict[str, int]) -> str:
+        lines = [f"[Minecraft Changelog] {version_id}", ""]
+        for section, field_name in CHANGELOG_SECTIONS.items():
+            lines.append(f"{section}: {counts.get(field_name, 0)} items")
+        lines.append("")
+        lines.append(f"Use /mcnews notes {version_id} <section> [page] to read a section.")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_changelog_page(version_id: str, section: str, items: List[str], page: int, pages: int) -> str:
+        lines = [f"[Minecraft Changelog] {version_id} - {section} ({page}/{pages})", ""]
+        start = (page - 1) * NOTES_PAGE_SIZE
+        for i, item in enumerate(items, start + 1):
+            lines.append(f"{i}. {item}")
+        if not items:
+            lines.append("(empty)")
+        if page < pages:
+            lines.append("")
+            lines.append(f"Next: /mcnews notes {version_id} {section} {page + 1}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_search_results(
+        query: str,
+        results: List[Tuple[str, List[str]]],
+        snippets: Dict[str, str]
+    ) -> str:
+        if not results:
+            return f"No changelog entries match: {query}"
+        shown = results[:SEARCH_MAX_RESULTS]
+        lines = [f"[Minecraft Changelog Search] {query} ({len(results)} versions)", ""]
+        for i, (version_id, sections) in enumerate(shown, 1):
+            lines.append(f"{i}. {version_id} [{', '.join(sections)}]")
+            snippet = snippets.get(version_id)
+            if snippet:
+                if len(snippet) > SEARCH_SNIPPET_LENGTH:
+                    snippet = snippet[:SEARCH_SNIPPET_LENGTH - 3] + "..."
+                lines.append(f"   {snippet}")
+        if len(results) > len(shown):
+            lines.append(f"... and {len(results) - len(shown)} more")
+        lines.append("")
+        lines.append("Read more: /mcnews notes <id> <section>")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_version_history(entries: List[VersionEntry], version_type: Optional[str] = None) -> str:
+        title = version_type or "all"
+        lines = [f"[Minecraft Version History] {title} (latest {len(entries)})", ""]
+        for i, entry in enumerate(entries, 1):
+            lines.append(f"{i}. {entry.id} ({entry.release_time[:10]})")
         return "\n".join(lines)
 
     @staticmethod
@@ -79,7 +218,8 @@ class MCNewsFormatter:
                 f"[{status.name}]",
                 f"Description: {status.description}",
                 "Status: Online",
-                f"Latency: {status.latency}ms"
+                f"Latency: {status.latency}ms",
+                f"Timing: DNS {status.dns_ms:.0f}ms / Connect {status.connect_ms:.0f}ms / TTFB {status.ttfb_ms:.0f}ms"
             ]
         else:
             lines = [
@@ -92,29 +232,65 @@ class MCNewsFormatter:
         return "\n".join(lines)
 
     @staticmethod
-    def format_services_status_all(services: List[MojangServiceStatus]) -> str:
-        lines = ["[Mojang Service Status]", ""]
-        
-        for service in services:
-            if service.online:
-                status_line = f"[OK] {service.name} ({service.latency}ms)"
-            else:
-                error_info = f" - {service.error_message}" if service.error_message else ""
-                status_line = f"[X] {service.name}: Offline{error_info}"
-            lines.append(status_line)
+    def format_latency_summary(label: str, summary: LatencySummary) -> str:
+        line = f"{label}: up {summary.uptime * 100:.1f}%"
+        if summary.p50 is not None:
+            line += f", p50/p95/p99 {summary.p50}/{summary.p95}/{summary.p99}ms"
+        return line
+
+    @staticmethod
+    def format_services_status_all(
+        services: List[MojangServiceStatus],
+        updated: Optional[float] = None,
+        summaries: Optional[Dict[str, Dict[str, LatencySummary]]] = None
+    ) -> str:
+        lines = []
+        for group, title in (("mojang", "[Mojang Service Status]"), ("custom", "[Custom Services]")):
+            grouped = [service for service in services if service.group == group]
+            if not grouped:
+                continue
+            if lines:
+                lines.append("")
+            lines.extend([title, ""])
+            for service in grouped:
+                if service.online:
+                    status_line = f"[OK] {service.name} ({service.latency}ms)"
+                    if service.detail:
+                        status_line += f" {service.detail}"
+                    if service.connect_ms or service.ttfb_ms:
+                        status_line += (
+                            f"\n     DNS {service.dns_ms:.0f} / Connect {service.connect_ms:.0f}"
+                            f" / TTFB {service.ttfb_ms:.0f} ms"
+                        )
+                else:
+                    error_info = f" - {service.error_message}" if service.error_message else ""
+                    status_line = f"[X] {service.name}: Offline{error_info}"
+                lines.append(status_line)
+                for label, summary in (summaries or {}).get(service.name, {}).items():
+                    lines.append(f"     {MCNewsFormatter.format_latency_summary(label, summary)}")
+        if not lines:
+            lines.extend(["[Mojang Service Status]", "", "No services configured."])
         
         lines.append("")
-        lines.append(f"Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append(MCNewsFormatter.format_updated(updated))
         
         return "\n".join(lines)
 
     @staticmethod
-    def format_service_change(service_name: str, is_online: bool, latency: float = None, error_message: str = None) -> str:
+    def format_service_change(
+        service_name: str,
+        is_online: bool,
+        latency: float = None,
+        error_message: str = None,
+        summary: Optional[LatencySummary] = None,
+        group: str = "mojang"
+    ) -> str:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        prefix = "Mojang服务" if group == "mojang" else "服务"
         
         if is_online:
             lines = [
-                "[Mojang服务恢复]",
+                f"[{prefix}恢复]",
                 "",
                 f"服务: {service_name}",
                 "状态: 已恢复正常",
@@ -124,7 +300,7 @@ class MCNewsFormatter:
             lines.extend(["", f"检测时间: {timestamp}"])
         else:
             lines = [
-                "[Mojang服务异常]",
+                f"[{prefix}异常]",
                 "",
                 f"服务: {service_name}",
                 "状态: 无法访问",
@@ -133,6 +309,142 @@ class MCNewsFormatter:
                 lines.append(f"错误: {error_message}")
             lines.extend(["", f"检测时间: {timestamp}"])
         
+        if summary is not None:
+            lines.insert(-2, f"近24小时可用率: {summary.uptime * 100:.1f}%")
+            if summary.p95 is not None:
+                lines.insert(-2, f"近24小时延迟: p50 {summary.p50}ms / p95 {summary.p95}ms / p99 {summary.p99}ms")
+        
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_service_changes(
+        changes: List[ServiceChange],
+        summaries: Optional[Dict[str, LatencySummary]] = None
+    ) -> str:
+        summaries = summaries or {}
+        if len(changes) == 1:
+            change = changes[0]
+            return MCNewsFormatter.format_service_change(
+                change.name,
+                change.online,
+                change.latency,
+                change.error_message,
+                summaries.get(change.name),
+                change.group
+            )
+
+        prefix = "Mojang服务" if all(change.group == "mojang" for change in changes) else "服务"
+        down = sum(1 for change in changes if not change.online)
+        counts = []
+        if down:
+            counts.append(f"{down} 个异常")
+        if len(changes) - down:
+            counts.append(f"{len(changes) - down} 个恢复")
+        lines = [f"[{prefix}状态变化] " + ", ".join(counts), ""]
+        for change in sorted(changes, key=lambda change: (change.online, change.name)):
+            if change.online:
+                lines.append(f"[OK] {change.name}: 已恢复正常 ({change.latency}ms)")
+            else:
+                error_info = f" - {change.error_message}" if change.error_message else ""
+                lines.append(f"[X] {change.name}: 无法访问{error_info}")
+            summary = summaries.get(change.name)
+            if summary is not None:
+                lines.append(f"     近24小时可用率: {summary.uptime * 100:.1f}%")
+        detected = max(change.detected for change in changes) or time.time()
+        lines.extend(["", f"检测时间: {datetime.fromtimestamp(detected).strftime('%Y-%m-%d %H:%M:%S')}"])
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_digest(
+        since: float,
+        versions: List[VersionEntry],
+        services: List[MojangServiceStatus],
+        summaries: Dict[str, LatencySummary],
+        outages: Dict[str, int],
+        collapsed: Dict[str, int]
+    ) -> str:
+        start = datetime.fromtimestamp(since).strftime('%Y-%m-%d %H:%M')
+        end = datetime.now().strftime('%Y-%m-%d %H:%M')
+        lines = [f"[MCNews 摘要] {start} ~ {end}", ""]
+
+        if versions:
+            lines.append(f"版本更新 ({len(versions)}):")
+            for entry in versions[:DIGEST_MAX_VERSIONS]:
+                display_type = entry.to_mc_version().display_type
+                lines.append(f"- {entry.id} ({display_type}, {entry.release_time[:10]})")
+            if len(versions) > DIGEST_MAX_VERSIONS:
+                lines.append(f"- ... 及其他 {len(versions) - DIGEST_MAX_VERSIONS} 个版本")
+        else:
+            lines.append("版本更新: 无")
+
+        if services:
+            lines.extend(["", "服务可用率 (近24小时):"])
+            for service in services:
+                summary = summaries.get(service.name)
+                line = f"- {service.name}: "
+                line += f"{summary.uptime * 100:.1f}%" if summary is not None else "暂无数据"
+                if not service.online:
+                    line += ", 当前离线"
+                if outages.get(service.name):
+                    line += f", 异常 {outages[service.name]} 次"
+                if collapsed.get(service.name):
+                    line += f", 短暂波动 {collapsed[service.name]} 次"
+                lines.append(line)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_ms(seconds: float) -> str:
+        ms = seconds * 1000
+        return f"{ms:.1f}" if ms < 10 else f"{ms:.0f}"
+
+    @staticmethod
+    def format_stats(metrics: MetricsRegistry, runtime: Dict[str, str]) -> str:
+        uptime = int(time.time() - metrics.started)
+        lines = [f"[MCNews Stats] uptime {uptime // 3600}h{uptime % 3600 // 60:02d}m", ""]
+        for title, name, label in _STATS_SECTIONS:
+            rows = metrics.histograms(f"{name}_seconds", label)
+            if not rows:
+                continue
+            outcomes = metrics.outcomes(f"{name}_total", label)
+            if len(rows) > STATS_MAX_ROWS:
+                rows.sort(key=lambda row: row[1].quantile(0.95), reverse=True)
+            lines.append(f"{title} (n, p50/p95/max ms):")
+            for value, histogram in rows[:STATS_MAX_ROWS]:
+                timings = "/".join(
+                    MCNewsFormatter._format_ms(seconds)
+                    for seconds in (histogram.quantile(0.5), histogram.quantile(0.95), histogram.max)
+                )
+                line = f"  {value}: {histogram.count}, {timings}"
+                other = {
+                    outcome: count for outcome, count in outcomes.get(value, {}).items() if outcome != "ok"
+                }
+                if other:
+                    line += " (" + ", ".join(f"{outcome} {int(count)}" for outcome, count in sorted(other.items())) + ")"
+                lines.append(line)
+            if len(rows) > STATS_MAX_ROWS:
+                lines.append(f"  ... and {len(rows) - STATS_MAX_ROWS} more")
+            lines.append("")
+        if len(lines) == 2:
+            lines.extend(["No measurements yet.", ""])
+        lines.append("Runtime:")
+        for key, value in runtime.items():
+            lines.append(f"  {key}: {value}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_profile(top: List[Tuple[str, int, float, float]], elapsed: float, path: str) -> str:
+        lines = [
+            f"[MCNews Profile] check cycle took {MCNewsFormatter._format_ms(elapsed)}ms",
+            "",
+            "Top functions by own time (calls, own/cumulative ms):"
+        ]
+        for i, (func, calls, tottime, cumtime) in enumerate(top, 1):
+            lines.append(
+                f"{i}. {func} {calls}, "
+                f"{MCNewsFormatter._format_ms(tottime)}/{MCNewsFormatter._format_ms(cumtime)}"
+            )
+        lines.append("")
+        lines.append(f"Full report: {path}")
         return "\n".join(lines)
 
     @staticmethod
@@ -153,11 +465,19 @@ class MCNewsFormatter:
 Commands:
   /mcnews status - View Mojang services status
   /mcnews latest - View latest MC versions
+  /mcnews version <id> - View a specific version
+  /mcnews details <id> - View Java/asset details of a version
+  /mcnews notes <id> [section] [page] - Read the full changelog
+  /mcnews history [type] [n] - View recent versions (release/snapshot/all)
+  /mcnews search <keyword|MC-id> - Search stored changelogs
+  /mcnews stats [profile] - View timings and errors, or profile one check cycle
+  /mcnews digest - Preview the next scheduled digest
   /mcnews add - Add current session to whitelist
   /mcnews remove - Remove current session from whitelist
   /mcnews list - View whitelist
 
 Auto-push:
   - Java version updates (release/snapshot/pre-release)
-  - Mojang service status changes"""
+  - Mojang service status changes (grouped per check)
+  - Optional scheduled digest of versions and uptime"""
 
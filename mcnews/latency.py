@@ -0,0 +1,148 @@
+import time
+import zlib
+import base64
+from array import array
+from typing import Dict, List, Optional
+
+from .models import MojangServiceStatus, LatencySummary
+from .constants import LATENCY_RING_CAPACITY, LATENCY_WINDOWS, LATENCY_PERSIST_INTERVAL
+
+_OFFLINE = 0xFFFF
+_LATENCY_MAX = 0xFFFE
+_BLOB_VERSION = 2
+
+
+class LatencyRing:
+
+    __slots__ = ("capacity", "_base", "_ts", "_latency", "_head", "_count")
+
+    def __init__(self, capacity: int = LATENCY_RING_CAPACITY):
+        self.capacity = capacity
+        # Timestamps are signed offsets from the first sample, so they fit in
+        # 32 bits past 2106 and survive the wall clock stepping back.
+        self._base: Optional[int] = None
+        self._ts = array("i", [0]) * capacity
+        self._latency = array("H", [0]) * capacity
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, ts: float, online: bool, latency: int):
+        if self._base is None:
+            self._base = int(ts)
+        self._ts[self._head] = int(ts) - self._base
+        self._latency[self._head] = min(max(int(latency), 0), _LATENCY_MAX) if online else _OFFLINE
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _positions(self):
+        start = self._head - self._count
+        return (i % self.capacity for i in range(start, self._head))
+
+    def summary(self, seconds: int, now: Optional[float] = None) -> Optional[LatencySummary]:
+        # Samples are whole seconds, so the cutoff is too; the wall clock may
+        # have stepped back, so every slot is checked instead of stopping at
+        # the first old one.
+        cutoff = int(time.time() if now is None else now) - seconds - (self._base or 0)
+        latencies: List[int] = []
+        total = 0
+        for position in self._positions():
+            if self._ts[position] < cutoff:
+                continue
+            total += 1
+            if self._latency[position] != _OFFLINE:
+                latencies.append(self._latency[position])
+        if not total:
+            return None
+        latencies.sort()
+        summary = LatencySummary(samples=total, uptime=len(latencies) / total)
+        if latencies:
+            summary.p50 = LatencyRing._percentile(latencies, 50)
+            summary.p95 = LatencyRing._percentile(latencies, 95)
+            summary.p99 = LatencyRing._percentile(latencies, 99)
+        return summary
+
+    @staticmethod
+    def _percentile(ordered: List[int], percent: int) -> int:
+        rank = max(1, -(-percent * len(ordered) // 100))
+        return ordered[rank - 1]
+
+    def dump(self) -> str:
+        ts = array("i", (self._ts[i] for i in self._positions()))
+        latency = array("H", (self._latency[i] for i in self._positions()))
+        deltas = array("i", [ts[0] if ts else 0]) + array(
+            "i", (ts[i] - ts[i - 1] for i in range(1, len(ts)))
+        )
+        raw = (
+            bytes([_BLOB_VERSION]) + (self._base or 0).to_bytes(8, "little", signed=True)
+            + len(ts).to_bytes(4, "little") + deltas.tobytes() + latency.tobytes()
+        )
+        return base64.b64encode(zlib.compress(raw)).decode("ascii")
+
+    @classmethod
+    def load(cls, blob: str, capacity: int = LATENCY_RING_CAPACITY) -> "LatencyRing":
+        ring = cls(capacity)
+        raw = zlib.decompress(base64.b64decode(blob))
+        if raw[0] == 1:
+            # Version 1 stored absolute unsigned seconds with no base.
+            base, deltas, offset = 0, array("I"), 1
+        elif raw[0] == _BLOB_VERSION:
+            base, deltas, offset = int.from_bytes(raw[1:9], "little", signed=True), array("i"), 9
+        else:
+            raise ValueError(f"Unsupported latency blob version {raw[0]}")
+        count = int.from_bytes(raw[offset:offset + 4], "little")
+        offset += 4
+        deltas.frombytes(raw[offset:offset + count * deltas.itemsize])
+        latency = array("H")
+        latency.frombytes(raw[offset + count * deltas.itemsize:])
+        ts = base
+        for delta, value in zip(deltas, latency):
+            ts += delta
+            if ring._base is None:
+                ring._base = ts
+            ring._ts[ring._head] = ts - ring._base
+            ring._latency[ring._head] = value
+            ring._head = (ring._head + 1) % capacity
+            ring._count = min(ring._count + 1, capacity)
+        return ring
+
+
+class ServiceHistory:
+
+    def __init__(self, capacity: int = LATENCY_RING_CAPACITY):
+        self.capacity = capacity
+        self._rings: Dict[str, LatencyRing] = {}
+        self._last_persist = time.monotonic()
+
+    def load(self, blobs: Dict[str, str]):
+        for name, blob in blobs.items():
+            try:
+                self._rings[name] = LatencyRing.load(blob, self.capacity)
+            except (ValueError, TypeError, IndexError, zlib.error):
+                continue
+
+    def dump(self) -> Dict[str, str]:
+        self._last_persist = time.monotonic()
+        return {name: ring.dump() for name, ring in self._rings.items()}
+
+    def due(self) -> bool:
+        return time.monotonic() - self._last_persist >= LATENCY_PERSIST_INTERVAL
+
+    def record(self, status: MojangServiceStatus, ts: Optional[float] = None):
+        ring = self._rings.get(status.name)
+        if ring is None:
+            ring = self._rings[status.name] = LatencyRing(self.capacity)
+        ring.append(time.time() if ts is None else ts, status.online, status.latency)
+
+    def summary(self, name: str, now: Optional[float] = None) -> Dict[str, LatencySummary]:
+        ring = self._rings.get(name)
+        if ring is None:
+            return {}
+        summaries = {}
+        for label, seconds in LATENCY_WINDOWS.items():
+            summary = ring.summary(seconds, now)
+            if summary is not None:
+                summaries[label] = summary
+        return summaries
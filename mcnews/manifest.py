@@ -0,0 +1,173 @@
+import codecs
+import json
+from typing import Any, Dict, List, Optional, Set
+
+
+class ManifestHeadParser:
+
+    _WHITESPACE = " \t\r\n"
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.latest: Optional[Dict[str, Any]] = None
+        self.versions: List[Dict[str, Any]] = []
+        self.done = False
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = ""
+        self._wanted: set = set()
+        self._eof = False
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.done:
+            return True
+        self._buf = self._buf[self._pos:] + self._utf8.decode(chunk)
+        self._pos = 0
+        self._run()
+        return self.done
+
+    def close(self) -> bool:
+        if not self.done:
+            self._eof = True
+            self._buf = self._buf[self._pos:] + self._utf8.decode(b"", final=True)
+            self._pos = 0
+            self._run()
+        self.done = True
+        return self.latest is not None
+
+    def result(self) -> Dict[str, Any]:
+        return {"latest": self.latest or {}, "versions": self.versions}
+
+    def _skip_ws(self) -> bool:
+        buf = self._buf
+        pos = self._pos
+        while pos < len(buf) and buf[pos] in self._WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buf)
+
+    def _expect(self, char: str) -> bool:
+        if not self._skip_ws():
+            return False
+        if self._buf[self._pos] != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos}")
+        self._pos += 1
+        return True
+
+    def _decode_value(self):
+        if not self._skip_ws():
+            return False, None
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            return False, None
+        if end >= len(self._buf) and not self._eof and not isinstance(value, (dict, list, str)):
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _satisfied(self) -> bool:
+        return (
+            self.latest is not None
+            and len(self.versions) >= self.limit
+            and not self._wanted
+        )
+
+    def _run(self):
+        while not self.done:
+            state = self._state
+            if state == "start":
+                if not self._expect("{"):
+                    return
+                self._state = "key"
+            elif state == "key":
+                if not self._skip_ws():
+                    return
+                if self._buf[self._pos] == "}":
+                    self._pos += 1
+                    self.done = True
+                    return
+                ok, key = self._decode_value()
+                if not ok:
+                    return
+                self._key = key
+                self._state = "colon"
+            elif state == "colon":
+                if not self._expect(":"):
+                    return
+                self._state = "versions_open" if self._key == "versions" else "value"
+            elif state == "value":
+                ok, value = self._decode_value()
+                if not ok:
+                    return
+                if self._key == "latest":
+                    self.latest = value
+                    self._wanted = {value.get("release"), value.get("snapshot")} - {None}
+                    for version in self.versions:
+                        self._wanted.discard(version.get("id"))
+                    if self._satisfied():
+                        self.done = True
+                        return
+                self._state = "next_key"
+            elif state == "next_key":
+                if not self._skip_ws():
+                    return
+                char = self._buf[self._pos]
+                self._pos += 1
+                if char == "}":
+                    self.done = True
+                    return
+                if char != ",":
+                    raise ValueError(f"Unexpected {char!r} at offset {self._pos - 1}")
+                self._state = "key"
+            elif state == "versions_open":
+                if not self._expect("["):
+                    return
+                self._state = "version"
+            elif state == "version":
+                if not self._skip_ws():
+                    return
+                if self._buf[self._pos] == "]":
+                    self._pos += 1
+                    self._state = "next_key"
+                    continue
+                ok, value = self._decode_value()
+                if not ok:
+                    return
+                if self.latest is None or len(self.versions) < self.limit or self._wanted:
+                    self.versions.append(value)
+                    self._wanted.discard(value.get("id"))
+                if self._satisfied():
+                    self.done = True
+                    return
+                self._state = "version_sep"
+            elif state == "version_sep":
+                if not self._skip_ws():
+                    return
+                char = self._buf[self._pos]
+                self._pos += 1
+                if char == "]":
+                    self._state = "next_key"
+                elif char == ",":
+                    self._state = "version"
+                else:
+                    raise ValueError(f"Unexpected {char!r} at offset {self._pos - 1}")
+
+
+def diff_new_versions(
+    versions: List[Dict[str, Any]],
+    known: Set[str],
+    last_notified: str
+) -> List[Dict[str, Any]]:
+    if known:
+        new = [version for version in versions if version.get("id") not in known]
+    else:
+        ids = [version.get("id") for version in versions]
+        cutoff = ids.index(last_notified) if last_notified in ids else 1
+        new = versions[:cutoff]
+    return sorted(new, key=lambda version: version.get("releaseTime", ""))
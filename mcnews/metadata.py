@@ -0,0 +1,108 @@
+import os
+import json
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from astrbot.api import logger
+
+from .models import VersionMetadata
+from .fetcher import MCNewsFetcher
+from .constants import (
+    METADATA_CACHE_DIR,
+    METADATA_FETCH_CONCURRENCY,
+    METADATA_SUMMARY_CACHE_SIZE
+)
+
+
+class VersionMetadataCache:
+
+    def __init__(self, fetcher: MCNewsFetcher, data_dir: str):
+        self._fetcher = fetcher
+        self.cache_dir = os.path.join(data_dir, METADATA_CACHE_DIR)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._summaries: "OrderedDict[str, VersionMetadata]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"downloads": 0, "cached": 0, "sha1_mismatch": 0}
+
+    def _path(self, sha1: str) -> str:
+        return os.path.join(self.cache_dir, sha1[:2], f"{sha1}.json")
+
+    def has(self, sha1: str) -> bool:
+        return bool(sha1) and os.path.exists(self._path(sha1))
+
+    @staticmethod
+    def _summarize(version_id: str, raw: Dict[str, Any]) -> VersionMetadata:
+        java = raw.get("javaVersion", {})
+        downloads = raw.get("downloads", {})
+        return VersionMetadata(
+            id=raw.get("id", version_id),
+            java_version=java.get("majorVersion", 0),
+            java_component=java.get("component", ""),
+            asset_index=raw.get("assetIndex", {}).get("id", raw.get("assets", "")),
+            main_class=raw.get("mainClass", ""),
+            compliance_level=raw.get("complianceLevel", 0),
+            client_size=downloads.get("client", {}).get("size", 0),
+            server_size=downloads.get("server", {}).get("size", 0)
+        )
+
+    def get(self, version_id: str, sha1: str) -> Optional[VersionMetadata]:
+        summary = self._summaries.get(sha1)
+        if summary is not None:
+            self._summaries.move_to_end(sha1)
+            return summary
+        if not self.has(sha1):
+            return None
+        try:
+            with open(self._path(sha1), "rb") as f:
+                summary = VersionMetadataCache._summarize(version_id, json.loads(f.read()))
+        except (OSError, ValueError) as e:
+            logger.warning(f"MCNews: Failed to read cached metadata for {version_id}: {e}")
+            return None
+        self._summaries[sha1] = summary
+        if len(self._summaries) > METADATA_SUMMARY_CACHE_SIZE:
+            self._summaries.popitem(last=False)
+        return summary
+
+    def _write(self, sha1: str, body: bytes):
+        path = self._path(sha1)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    async def _download(self, version_id: str, url: str, sha1: str) -> bool:
+        body = await self._fetcher.fetch_bytes(url, endpoint="version_metadata")
+        if not body:
+            return False
+        if hashlib.sha1(body).hexdigest() != sha1:
+            self.stats["sha1_mismatch"] += 1
+            logger.warning(f"MCNews: sha1 mismatch for {version_id} metadata, discarded")
+            return False
+        await asyncio.get_running_loop().run_in_executor(None, self._write, sha1, body)
+        self.stats["downloads"] += 1
+        return True
+
+    async def fetch(self, version_id: str, url: str, sha1: str) -> bool:
+        if not url or not sha1:
+            return False
+        if self.has(sha1):
+            self.stats["cached"] += 1
+            return True
+        inflight = self._inflight.get(sha1)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._download(version_id, url, sha1))
+            self._inflight[sha1] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(sha1, None))
+        return await asyncio.shield(inflight)
+
+    async def prefetch(self, versions: List[Dict[str, Any]], concurrency: int = METADATA_FETCH_CONCURRENCY):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(version: Dict[str, Any]):
+            async with semaphore:
+                await self.fetch(version.get("id", ""), version.get("url", ""), version.get("sha1", ""))
+
+        await asyncio.gather(*(fetch_one(version) for version in versions))
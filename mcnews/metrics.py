@@ -0,0 +1,246 @@
+import os
+import time
+import cProfile
+import io
+import pstats
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Tuple
+
+from .constants import METRICS_BUCKETS, PROFILE_TOP_N, PROFILE_REPORT_LINES
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+METRIC_HELP = {
+    "mcnews_fetch_seconds": "Time spent on HTTP fetches by endpoint",
+    "mcnews_fetch_total": "HTTP fetches by endpoint and outcome",
+    "mcnews_parse_seconds": "Time spent parsing fetched payloads",
+    "mcnews_probe_seconds": "Service probe duration",
+    "mcnews_probe_total": "Service probes by outcome",
+    "mcnews_storage_flush_seconds": "Time spent writing storage files",
+    "mcnews_storage_flush_total": "Storage flushes by outcome",
+    "mcnews_send_seconds": "Per-session message send duration",
+    "mcnews_send_total": "Per-session message sends by outcome",
+    "mcnews_check_seconds": "Duration of scheduled check cycles",
+    "mcnews_check_total": "Scheduled check cycles by outcome",
+    "mcnews_loop_lag_seconds": "Event loop lag observed by the lag monitor",
+    "mcnews_loop_stalls": "Event loop stalls above the warning threshold",
+    "mcnews_cpu_tasks": "CPU-bound tasks by executor placement",
+    "mcnews_manifest_cache": "Version manifest conditional requests by result",
+    "mcnews_manifest_bytes_saved": "Manifest bytes not downloaded thanks to 304 responses",
+    "mcnews_probe_connections": "HTTP service probes by pooled connection reuse",
+    "mcnews_version_metadata": "Version metadata lookups by result",
+    "mcnews_patch_notes": "Patch notes index and body fetches by result",
+    "mcnews_reply_cache": "Status and latest command cache lookups by result",
+    "mcnews_outbox_pending": "Deliveries waiting in the outbox",
+    "mcnews_changes_pending": "Service changes waiting in the coalescing window",
+    "mcnews_flaps_collapsed": "Service down/up pairs dropped inside the coalescing window",
+    "mcnews_uptime_seconds": "Seconds since the plugin started",
+}
+
+
+class Histogram:
+
+    __slots__ = ("bounds", "buckets", "count", "sum", "max")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.buckets):
+            if n and cumulative + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - cumulative) / n)
+            cumulative += n
+        return self.max
+
+
+class MetricsRegistry:
+
+    def __init__(self, bounds: Tuple[float, ...] = METRICS_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.started = time.time()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        series = self._counters.setdefault(name, {})
+        key = MetricsRegistry._key(labels)
+        series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        self._gauges.setdefault(name, {})[MetricsRegistry._key(labels)] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        series = self._histograms.setdefault(name, {})
+        key = MetricsRegistry._key(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram(self.bounds)
+        histogram.observe(seconds)
+
+    def record(self, name: str, seconds: float, outcome: str, **labels):
+        self.observe(f"{name}_seconds", seconds, **labels)
+        self.inc(f"{name}_total", outcome=outcome, **labels)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, func: Callable[..., Awaitable[Any]], **labels) -> Callable[..., Awaitable[Any]]:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                self.record(name, time.perf_counter() - start, outcome, **labels)
+        return wrapper
+
+    def histograms(self, name: str, label: str) -> List[Tuple[str, Histogram]]:
+        rows = []
+        for key, histogram in self._histograms.get(name, {}).items():
+            rows.append((dict(key).get(label, ""), histogram))
+        return sorted(rows, key=lambda row: row[0])
+
+    def outcomes(self, name: str, label: str) -> Dict[str, Dict[str, float]]:
+        result: Dict[str, Dict[str, float]] = {}
+        for key, value in self._counters.get(name, {}).items():
+            labels = dict(key)
+            outcomes = result.setdefault(labels.get(label, ""), {})
+            outcome = labels.get("outcome", "")
+            outcomes[outcome] = outcomes.get(outcome, 0.0) + value
+        return result
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    @staticmethod
+    def _labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = key + extra
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{MetricsRegistry._escape(value)}"' for name, value in pairs) + "}"
+
+    @staticmethod
+    def _value(value: float) -> str:
+        if value == int(value) and abs(value) < 1e15:
+            return str(int(value))
+        return repr(float(value))
+
+    def _header(self, lines: List[str], name: str, kind: str):
+        help_text = METRIC_HELP.get(name)
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name in sorted(self._counters):
+            self._header(lines, name, "counter")
+            for key, value in sorted(self._counters[name].items()):
+                lines.append(f"{name}{MetricsRegistry._labels(key)} {MetricsRegistry._value(value)}")
+        for name in sorted(self._gauges):
+            self._header(lines, name, "gauge")
+            for key, value in sorted(self._gauges[name].items()):
+                lines.append(f"{name}{MetricsRegistry._labels(key)} {MetricsRegistry._value(value)}")
+        for name in sorted(self._histograms):
+            self._header(lines, name, "histogram")
+            for key, histogram in sorted(self._histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(self.bounds, histogram.buckets):
+                    cumulative += count
+                    le = (("le", repr(bound)),)
+                    lines.append(f"{name}_bucket{MetricsRegistry._labels(key, le)} {cumulative}")
+                le = (("le", "+Inf"),)
+                lines.append(f"{name}_bucket{MetricsRegistry._labels(key, le)} {histogram.count}")
+                lines.append(f"{name}_sum{MetricsRegistry._labels(key)} {repr(histogram.sum)}")
+                lines.append(f"{name}_count{MetricsRegistry._labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        payload = self.render()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+
+class CycleProfiler:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.running = False
+        self.elapsed = 0.0
+        self.top: List[Tuple[str, int, float, float]] = []
+
+    @staticmethod
+    def _describe(func: Tuple[str, int, str]) -> str:
+        filename, line, name = func
+        if filename == "~":
+            return name
+        return f"{os.path.basename(filename)}:{line}({name})"
+
+    async def run(self, func: Callable[[], Awaitable[Any]]) -> List[Tuple[str, int, float, float]]:
+        if self.running:
+            raise RuntimeError("A profiled cycle is already running")
+        profile = cProfile.Profile()
+        self.running = True
+        start = time.perf_counter()
+        # cProfile hooks the whole thread, so other tasks that run while the
+        # cycle awaits are included; the report is a picture of the loop, not
+        # of the cycle's call tree alone.
+        try:
+            profile.enable()
+            try:
+                await func()
+            finally:
+                profile.disable()
+        finally:
+            self.running = False
+            self.elapsed = time.perf_counter() - start
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stream.write(f"MCNews check cycle profile, {time.strftime('%Y-%m-%d %H:%M:%S')}, ")
+        stream.write(f"{self.elapsed * 1000:.1f}ms wall\n\n")
+        stats.sort_stats("tottime").print_stats(PROFILE_REPORT_LINES)
+        stats.sort_stats("cumulative").print_stats(PROFILE_REPORT_LINES)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(stream.getvalue())
+
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        self.top = [
+            (CycleProfiler._describe(func), calls, tottime, cumtime)
+            for func, (_, calls, tottime, cumtime, _) in rows[:PROFILE_TOP_N]
+        ]
+        return self.top
@@ -1,7 +1,11 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional
 import re
 
+_SNAPSHOT_RE = re.compile(r'^\d+w\d+[a-z]$')
+_PRE_RELEASE_RE = re.compile(r'(.+)-pre(\d+)')
+_RELEASE_CANDIDATE_RE = re.compile(r'(.+)-rc(\d+)')
+
 
 @dataclass
 class MCVersionContent:
@@ -10,6 +14,22 @@ class MCVersionContent:
     bug_fixes: List[str] = field(default_factory=list)
     technical_changes: List[str] = field(default_factory=list)
 
+    @property
+    def has_items(self) -> bool:
+        return bool(self.new_features or self.changes or self.bug_fixes or self.technical_changes)
+
+
+@dataclass
+class VersionMetadata:
+    id: str
+    java_version: int = 0
+    java_component: str = ""
+    asset_index: str = ""
+    main_class: str = ""
+    compliance_level: int = 0
+    client_size: int = 0
+    server_size: int = 0
+
 
 @dataclass
 class MCVersion:
@@ -19,21 +39,23 @@ class MCVersion:
     time: str
     release_time: str
     content: MCVersionContent = None
+    sha1: str = ""
+    metadata: VersionMetadata = None
 
     @property
     def article_url(self) -> str:
         version_id = self.id
-        if re.match(r'^\d+w\d+[a-z]$', version_id):
+        if _SNAPSHOT_RE.match(version_id):
             slug = f"minecraft-snapshot-{version_id}"
         elif '-pre' in version_id:
-            match = re.match(r'(.+)-pre(\d+)', version_id)
+            match = _PRE_RELEASE_RE.match(version_id)
             if match:
                 ver, num = match.groups()
                 slug = f"minecraft-{ver.replace('.', '-')}-pre-release-{num}"
             else:
                 slug = f"minecraft-{version_id.replace('.', '-')}"
         elif '-rc' in version_id:
-            match = re.match(r'(.+)-rc(\d+)', version_id)
+            match = _RELEASE_CANDIDATE_RE.match(version_id)
             if match:
                 ver, num = match.groups()
                 slug = f"minecraft-{ver.replace('.', '-')}-release-candidate-{num}"
@@ -49,7 +71,7 @@ class MCVersion:
             return "Pre-Release"
         elif '-rc' in self.id:
             return "Release Candidate"
-        elif re.match(r'^\d+w\d+[a-z]$', self.id):
+        elif _SNAPSHOT_RE.match(self.id):
             return "Snapshot"
         else:
             return "Release"
@@ -63,4 +85,57 @@ class MojangServiceStatus:
     online: bool
     latency: int = 0
     error_message: str = ""
+    dns_ms: float = 0.0
+    connect_ms: float = 0.0
+    ttfb_ms: float = 0.0
+    reused: bool = False
+    group: str = "mojang"
+    detail: str = ""
+
+
+@dataclass
+class LatencySummary:
+    samples: int
+    uptime: float
+    p50: Optional[int] = None
+    p95: Optional[int] = None
+    p99: Optional[int] = None
+
+
+
+@dataclass
+class DeliveryReport:
+    total: int = 0
+    sent: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+@dataclass
+class ServiceChange:
+    name: str
+    online: bool
+    latency: int = 0
+    error_message: str = ""
+    group: str = "mojang"
+    detected: float = 0.0
+
+
+@dataclass(slots=True)
+class VersionEntry:
+    id: str
+    type: str
+    url: str
+    time: str
+    release_time: str
+    sha1: str = ""
 
+    def to_mc_version(self) -> MCVersion:
+        return MCVersion(
+            id=self.id,
+            type=self.type,
+            url=self.url,
+            time=self.time,
+            release_time=self.release_time,
+            sha1=self.sha1
+        )
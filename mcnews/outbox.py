@@ -0,0 +1,125 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from .storage import DataStorage
+from .constants import (
+    OUTBOX_RETRY_BASE,
+    OUTBOX_RETRY_MAX,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_DELIVERED_KEEP
+)
+
+
+class DeliveryOutbox(DataStorage):
+
+    def __init__(self, filename: str = "mcnews_outbox.json", journal: bool = False):
+        self._pending_counts: Optional[Dict[str, int]] = None
+        super().__init__(filename, journal)
+        self._delivered = set(self.data.get("delivered", []))
+
+    def _load(self) -> Dict[str, Any]:
+        self._pending_counts = None
+        return super()._load()
+
+    def _counts(self) -> Dict[str, int]:
+        # Pending sessions per notification, so finishing one session does
+        # not rescan the whole outbox.
+        if self._pending_counts is None:
+            counts: Dict[str, int] = {}
+            for entry in self.data.get("pending", {}).values():
+                counts[entry["notification_id"]] = counts.get(entry["notification_id"], 0) + 1
+            self._pending_counts = counts
+        return self._pending_counts
+
+    def _default_data(self) -> Dict[str, Any]:
+        return {
+            "notifications": {},
+            "pending": {},
+            "delivered": []
+        }
+
+    @staticmethod
+    def make_key(notification_id: str, session: str) -> str:
+        return f"{notification_id}|{session}"
+
+    def enqueue(self, notification_id: str, message: str, sessions: List[str]) -> int:
+        pending = self.data.setdefault("pending", {})
+        counts = self._counts()
+        added = 0
+        for session in sessions:
+            key = DeliveryOutbox.make_key(notification_id, session)
+            if key in pending or key in self._delivered:
+                continue
+            pending[key] = {
+                "notification_id": notification_id,
+                "session": session,
+                "attempts": 0,
+                "next_attempt": 0,
+                "error": ""
+            }
+            added += 1
+        if added:
+            counts[notification_id] = counts.get(notification_id, 0) + added
+            self.data.setdefault("notifications", {}).setdefault(notification_id, {
+                "message": message,
+                "created": time.time()
+            })
+        return added
+
+    def get_message(self, notification_id: str) -> Optional[str]:
+        notification = self.data.get("notifications", {}).get(notification_id)
+        return notification["message"] if notification else None
+
+    def has_pending(self) -> bool:
+        return bool(self.data.get("pending"))
+
+    def due(self, now: Optional[float] = None) -> Dict[str, List[str]]:
+        now = time.time() if now is None else now
+        batches: Dict[str, List[str]] = {}
+        for entry in self.data.get("pending", {}).values():
+            if entry["next_attempt"] <= now:
+                batches.setdefault(entry["notification_id"], []).append(entry["session"])
+        return batches
+
+    def mark_delivered(self, notification_id: str, session: str):
+        key = DeliveryOutbox.make_key(notification_id, session)
+        if self.data.get("pending", {}).pop(key, None) is not None:
+            self._release(notification_id)
+        if key not in self._delivered:
+            self._delivered.add(key)
+            delivered = self.data.setdefault("delivered", [])
+            delivered.append(key)
+            if len(delivered) > OUTBOX_DELIVERED_KEEP:
+                for old in delivered[:-OUTBOX_DELIVERED_KEEP]:
+                    self._delivered.discard(old)
+                self.data["delivered"] = delivered[-OUTBOX_DELIVERED_KEEP:]
+        self._collect(notification_id)
+
+    def mark_failed(self, notification_id: str, session: str, error: str) -> bool:
+        key = DeliveryOutbox.make_key(notification_id, session)
+        entry = self.data.get("pending", {}).get(key)
+        if entry is None:
+            return False
+        entry["attempts"] += 1
+        entry["error"] = error
+        if entry["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+            del self.data["pending"][key]
+            self._release(notification_id)
+            self._collect(notification_id)
+            return False
+        delay = min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_BASE * 2 ** (entry["attempts"] - 1))
+        entry["next_attempt"] = time.time() + delay
+        return True
+
+    def _release(self, notification_id: str):
+        counts = self._counts()
+        remaining = counts.get(notification_id, 0) - 1
+        if remaining > 0:
+            counts[notification_id] = remaining
+        else:
+            counts.pop(notification_id, None)
+
+    def _collect(self, notification_id: str):
+        if notification_id in self._counts():
+            return
+        self.data.get("notifications", {}).pop(notification_id, None)
@@ -0,0 +1,166 @@
+import os
+import re
+import json
+import time
+import asyncio
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+from astrbot.api import logger
+
+from .models import MCVersionContent
+from .storage import DataStorage
+from .fetcher import MCNewsFetcher
+from .executor import CPUExecutor
+from .changelog import ChangelogStore
+from .constants import (
+    JAVA_PATCH_NOTES,
+    PATCH_NOTES_BASE,
+    PATCH_NOTES_DIR,
+    PATCH_NOTES_SYNC_INTERVAL
+)
+
+_UNSAFE_RE = re.compile(r'[^A-Za-z0-9._-]')
+
+
+class PatchNotesMirror(DataStorage):
+
+    def __init__(self, filename: str = "mcnews_patch_notes.json"):
+        super().__init__(filename)
+
+    def _default_data(self) -> Dict[str, Any]:
+        return {
+            "etag": "",
+            "last_modified": "",
+            "entries": {}
+        }
+
+
+class PatchNotesEngine:
+
+    def __init__(
+        self,
+        fetcher: MCNewsFetcher,
+        executor: CPUExecutor,
+        changelog: Optional[ChangelogStore] = None
+    ):
+        self._fetcher = fetcher
+        self._executor = executor
+        self._changelog = changelog
+        self.mirror = PatchNotesMirror()
+        self.content_dir = os.path.join(self.mirror.data_dir, PATCH_NOTES_DIR)
+        os.makedirs(self.content_dir, exist_ok=True)
+        self._last_sync = 0.0
+        self._sync_lock = asyncio.Lock()
+        self.stats = {"index_not_modified": 0, "index_updates": 0, "bodies": 0, "local": 0}
+
+    @staticmethod
+    def _parse_index(body: bytes) -> Dict[str, Dict[str, Any]]:
+        entries = {}
+        for entry in json.loads(body).get("entries", []):
+            version = entry.get("version")
+            if not version:
+                continue
+            item = {
+                "id": entry.get("id", version),
+                "title": entry.get("title", ""),
+                "date": entry.get("date", ""),
+                "content_path": entry.get("contentPath", ""),
+            }
+            if "body" in entry:
+                item["body"] = entry["body"]
+            entries[version] = item
+        return entries
+
+    async def sync(self, force: bool = False) -> bool:
+        async with self._sync_lock:
+            if not force and time.monotonic() - self._last_sync < PATCH_NOTES_SYNC_INTERVAL:
+                return False
+            self._last_sync = time.monotonic()
+            data = self.mirror.data
+            status, body, etag, last_modified = await self._fetcher.fetch_conditional(
+                JAVA_PATCH_NOTES,
+                data.get("etag", "") if data.get("entries") else "",
+                data.get("last_modified", "") if data.get("entries") else "",
+                endpoint="patch_notes_index"
+            )
+            if status == 304:
+                self.stats["index_not_modified"] += 1
+                return False
+            if status != 200:
+                return False
+            try:
+                with self._fetcher.metrics.timer("mcnews_parse_seconds", kind="patch_notes_index"):
+                    entries = await self._executor.run(len(body), PatchNotesEngine._parse_index, body)
+            except ValueError as e:
+                logger.warning(f"MCNews: Failed to parse patch notes index: {e}")
+                return False
+            data["entries"] = entries
+            data["etag"] = etag
+            data["last_modified"] = last_modified
+            self.mirror.save()
+            self.stats["index_updates"] += 1
+            return True
+
+    def _content_path(self, entry: Dict[str, Any]) -> str:
+        name = _UNSAFE_RE.sub("_", str(entry["id"]))
+        return os.path.join(self.content_dir, f"{name}.json")
+
+    def _load_content(self, path: str) -> Optional[MCVersionContent]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return MCVersionContent(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _save_content(self, path: str, content: MCVersionContent):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(content), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    async def _fetch_body(self, entry: Dict[str, Any]) -> str:
+        if "body" in entry:
+            return entry["body"]
+        if not entry.get("content_path"):
+            return ""
+        raw = await self._fetcher.fetch_bytes(
+            PATCH_NOTES_BASE + entry["content_path"],
+            endpoint="patch_notes_body"
+        )
+        if not raw:
+            return ""
+        try:
+            return json.loads(raw).get("body", "")
+        except ValueError:
+            return ""
+
+    async def get_content(self, version_id: str) -> Optional[MCVersionContent]:
+        entry = self.mirror.data.get("entries", {}).get(version_id)
+        if entry is None:
+            await self.sync()
+            entry = self.mirror.data.get("entries", {}).get(version_id)
+            if entry is None:
+                return None
+
+        path = self._content_path(entry)
+        content = self._load_content(path)
+        if content is not None:
+            self.stats["local"] += 1
+            return content if content.has_items else None
+
+        body = await self._fetch_body(entry)
+        if not body:
+            return None
+        with self._fetcher.metrics.timer("mcnews_parse_seconds", kind="article"):
+            content, full = await self._executor.run(len(body), MCNewsFetcher._parse_article_full, body)
+        self.stats["bodies"] += 1
+        if self._changelog is not None and full.has_items:
+            await self._changelog.save(version_id, full)
+        await asyncio.get_running_loop().run_in_executor(None, self._save_content, path, content)
+        return content if content.has_items else None
+
+    async def close(self):
+        await self.mirror.close()
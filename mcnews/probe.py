@@ -0,0 +1,144 @@
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import aiohttp
+
+
+class ProbeTimings:
+
+    __slots__ = ("start", "dns_start", "dns_end", "connect_start", "connect_end", "headers", "reused")
+
+    def __init__(self):
+        self.start: Optional[float] = None
+        self.dns_start: Optional[float] = None
+        self.dns_end: Optional[float] = None
+        self.connect_start: Optional[float] = None
+        self.connect_end: Optional[float] = None
+        self.headers: Optional[float] = None
+        self.reused = False
+
+    @staticmethod
+    def _span(start: Optional[float], end: Optional[float]) -> float:
+        if start is None or end is None:
+            return 0.0
+        return max(0.0, (end - start) * 1000)
+
+    def mark_headers(self):
+        if self.headers is None:
+            self.headers = time.monotonic()
+
+    @property
+    def dns_ms(self) -> float:
+        return ProbeTimings._span(self.dns_start, self.dns_end)
+
+    @property
+    def connect_ms(self) -> float:
+        return ProbeTimings._span(self.connect_start, self.connect_end)
+
+    @property
+    def ttfb_ms(self) -> float:
+        ready = self.connect_end or self.start
+        return ProbeTimings._span(ready, self.headers)
+
+    @property
+    def total_ms(self) -> float:
+        return ProbeTimings._span(self.start, self.headers)
+
+
+def _timings(trace_config_ctx) -> Optional[ProbeTimings]:
+    timings = trace_config_ctx.trace_request_ctx
+    return timings if isinstance(timings, ProbeTimings) else None
+
+
+async def _on_request_start(session, trace_config_ctx, params):
+    timings = _timings(trace_config_ctx)
+    if timings is not None and timings.start is None:
+        timings.start = time.monotonic()
+
+
+async def _on_dns_resolvehost_start(session, trace_config_ctx, params):
+    timings = _timings(trace_config_ctx)
+    if timings is not None:
+        timings.dns_start = time.monotonic()
+
+
+async def _on_dns_resolvehost_end(session, trace_config_ctx, params):
+    timings = _timings(trace_config_ctx)
+    if timings is not None:
+        timings.dns_end = time.monotonic()
+
+
+async def _on_connection_create_start(session, trace_config_ctx, params):
+    timings = _timings(trace_config_ctx)
+    if timings is not None:
+        timings.connect_start = time.monotonic()
+
+
+async def _on_connection_create_end(session, trace_config_ctx, params):
+    timings = _timings(trace_config_ctx)
+    if timings is not None:
+        timings.connect_end = time.monotonic()
+
+
+async def _on_connection_reuseconn(session, trace_config_ctx, params):
+    timings = _timings(trace_config_ctx)
+    if timings is not None:
+        timings.reused = True
+
+
+async def _on_request_end(session, trace_config_ctx, params):
+    timings = _timings(trace_config_ctx)
+    if timings is not None:
+        timings.mark_headers()
+
+
+def create_probe_trace_config() -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_dns_resolvehost_start.append(_on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    trace_config.on_request_end.append(_on_request_end)
+    return trace_config
+
+
+class ServiceStateTracker:
+
+    def __init__(self):
+        self.confirmed: Dict[str, bool] = {}
+        self._streaks: Dict[str, int] = {}
+
+    def seed(self, name: str, online: bool):
+        self.confirmed[name] = online
+        self._streaks.pop(name, None)
+
+    def load(self, states: Dict[str, Dict[str, Any]]):
+        for name, state in states.items():
+            if not isinstance(state, dict) or "online" not in state:
+                continue
+            self.confirmed[name] = bool(state["online"])
+            if state.get("pending"):
+                self._streaks[name] = int(state["pending"])
+
+    def dump(self, names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {"online": self.confirmed[name], "pending": self._streaks.get(name, 0)}
+            for name in names if name in self.confirmed
+        }
+
+    def observe(self, name: str, online: bool, threshold: int = 1) -> bool:
+        confirmed = self.confirmed.get(name)
+        if confirmed is None:
+            self.seed(name, online)
+            return False
+        if online == confirmed:
+            self._streaks.pop(name, None)
+            return False
+        streak = self._streaks.get(name, 0) + 1
+        if streak >= max(1, threshold):
+            self.seed(name, online)
+            return True
+        self._streaks[name] = streak
+        return False
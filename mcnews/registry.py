@@ -0,0 +1,92 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+from urllib.parse import urlsplit
+
+from .constants import MOJANG_SERVICES, SLP_DEFAULT_PORT
+
+T = TypeVar("T")
+
+
+class ServiceRegistry:
+
+    def __init__(self, config: Any):
+        self.config = config
+        self.invalid: List[str] = []
+        self._key: Optional[tuple] = None
+        self._services: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def parse(entry: str) -> Optional[Dict[str, Any]]:
+        parts = [part.strip() for part in entry.split("|")]
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            return None
+        name, address = parts[0], parts[1]
+        description = parts[2] if len(parts) > 2 and parts[2] else address
+        try:
+            url = urlsplit(address)
+            port = url.port
+        except ValueError:
+            return None
+        scheme = url.scheme.lower()
+        if scheme in ("http", "https") and url.hostname:
+            return {
+                "name": name,
+                "url": address,
+                "description": description,
+                "type": "http",
+                "group": "custom"
+            }
+        if scheme in ("mc", "minecraft") and url.hostname:
+            return {
+                "name": name,
+                "url": address,
+                "description": description,
+                "type": "slp",
+                "group": "custom",
+                "host": url.hostname,
+                "port": port or SLP_DEFAULT_PORT
+            }
+        return None
+
+    def services(self) -> List[Dict[str, Any]]:
+        entries = tuple(self.config.get("custom_services", []) or ())
+        include_mojang = bool(self.config.get("monitor_mojang_services", True))
+        key = (include_mojang, entries)
+        if key == self._key:
+            return self._services
+
+        services = []
+        if include_mojang:
+            services.extend(dict(service, type="http", group="mojang") for service in MOJANG_SERVICES)
+        names = {service["name"] for service in services}
+        invalid = []
+        for entry in entries:
+            service = ServiceRegistry.parse(str(entry))
+            if service is None or service["name"] in names:
+                invalid.append(str(entry))
+                continue
+            names.add(service["name"])
+            services.append(service)
+
+        self._key = key
+        self._services = services
+        self.invalid = invalid
+        return services
+
+
+async def run_staggered(
+    items: Sequence[T],
+    func: Callable[[T], Awaitable[Any]],
+    concurrency: int,
+    stagger: float = 0.0
+) -> List[Any]:
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    step = stagger / len(items) if stagger > 0 and len(items) > concurrency else 0.0
+
+    async def run(position: int, item: T):
+        if step:
+            await asyncio.sleep(position * step)
+        async with semaphore:
+            return await func(item)
+
+    return list(await asyncio.gather(*(run(i, item) for i, item in enumerate(items))))
@@ -0,0 +1,104 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from .models import MojangServiceStatus
+from .version_index import VersionIndex
+from .constants import (
+    RELEASE_WINDOW_SAMPLE,
+    RELEASE_WINDOW_MIN_SAMPLES,
+    RELEASE_WINDOW_MIN_SHARE,
+    SERVICE_STABLE_STEP,
+    SERVICE_BACKOFF_MAX_STEPS
+)
+
+
+class ReleaseWindowModel:
+
+    def __init__(self):
+        self.samples = 0
+        self._hot: Set[Tuple[int, int]] = set()
+
+    @property
+    def trained(self) -> bool:
+        return self.samples >= RELEASE_WINDOW_MIN_SAMPLES
+
+    @staticmethod
+    def _slot(moment: datetime) -> Tuple[int, int]:
+        moment = moment.astimezone(timezone.utc)
+        return moment.weekday(), moment.hour
+
+    def learn(self, release_times: Iterable[str]):
+        counts: Counter = Counter()
+        for release_time in release_times:
+            try:
+                moment = datetime.fromisoformat(release_time)
+            except ValueError:
+                continue
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            counts[ReleaseWindowModel._slot(moment)] += 1
+
+        self.samples = sum(counts.values())
+        threshold = max(2, self.samples * RELEASE_WINDOW_MIN_SHARE)
+        hot = set()
+        for (weekday, hour), count in counts.items():
+            if count < threshold:
+                continue
+            # Mojang releases on Stockholm local time, so the UTC hour drifts
+            # by one across DST; widen each slot to its neighbours.
+            for offset in (-1, 0, 1):
+                slot_hour = weekday * 24 + hour + offset
+                hot.add(((slot_hour // 24) % 7, slot_hour % 24))
+        self._hot = hot
+
+    def in_window(self, now: Optional[datetime] = None) -> bool:
+        return ReleaseWindowModel._slot(now or datetime.now(timezone.utc)) in self._hot
+
+    def windows(self) -> List[Tuple[int, int]]:
+        return sorted(self._hot)
+
+
+class PollingPolicy:
+
+    def __init__(self, config: Any):
+        self.config = config
+        self.windows = ReleaseWindowModel()
+        self.degraded = False
+        self._stable_checks = 0
+        self._learned_from: Optional[VersionIndex] = None
+
+    @property
+    def adaptive(self) -> bool:
+        return bool(self.config.get("adaptive_schedule", False))
+
+    def learn(self, index: Optional[VersionIndex]) -> bool:
+        if not index or index is self._learned_from:
+            return False
+        self._learned_from = index
+        self.windows.learn(
+            entry.release_time for entry in index.history(None, RELEASE_WINDOW_SAMPLE)
+        )
+        return True
+
+    def observe_services(self, services: List[MojangServiceStatus]):
+        self.degraded = any(not service.online for service in services)
+        self._stable_checks = 0 if self.degraded else self._stable_checks + 1
+
+    def version_interval(self, now: Optional[datetime] = None) -> int:
+        base = self.config.get("version_check_interval", 15) * 60
+        if not self.adaptive or not self.windows.trained:
+            return base
+        if self.windows.in_window(now):
+            return min(base, self.config.get("version_check_hot_interval", 2) * 60)
+        return max(base, self.config.get("version_check_cold_interval", 30) * 60)
+
+    def service_interval(self) -> int:
+        base = self.config.get("service_check_interval", 5) * 60
+        if not self.adaptive:
+            return base
+        if self.degraded:
+            return min(base, self.config.get("service_check_degraded_interval", 1) * 60)
+        steps = min(self._stable_checks // SERVICE_STABLE_STEP, SERVICE_BACKOFF_MAX_STEPS)
+        ceiling = max(base, self.config.get("service_check_max_interval", 20) * 60)
+        return min(ceiling, base * 2 ** steps)
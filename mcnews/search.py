@@ -0,0 +1,188 @@
+import os
+import re
+import json
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+
+from astrbot.api import logger
+
+from .models import MCVersionContent
+from .changelog import ChangelogStore
+from .version_index import VersionIndex
+from .constants import SEARCH_INDEX_FILE, CHANGELOG_SECTIONS
+
+_MC_ID_RE = re.compile(r'\bmc-\d+\b')
+_WORD_RE = re.compile(r'[a-z0-9_]{2,}')
+_STOPWORDS = frozenset((
+    "the", "and", "for", "are", "was", "were", "has", "have", "with", "from",
+    "that", "this", "when", "which", "now", "not", "can", "will", "been", "into",
+    "its", "they", "them", "than", "then", "also", "some", "more", "did", "you",
+))
+_SECTION_BITS = {field_name: 1 << i for i, field_name in enumerate(CHANGELOG_SECTIONS.values())}
+
+
+def tokenize(text: str) -> Set[str]:
+    text = text.lower()
+    tokens = set(_MC_ID_RE.findall(text))
+    tokens.update(word for word in _WORD_RE.findall(text) if word not in _STOPWORDS)
+    return tokens
+
+
+class ChangelogSearchIndex:
+
+    def __init__(self, data_dir: str, changelog: ChangelogStore):
+        self.index_file = os.path.join(data_dir, SEARCH_INDEX_FILE)
+        self._changelog = changelog
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._versions: Dict[str, Dict[str, int]] = {}
+        self._order: Dict[str, int] = {}
+        self._loaded = False
+        self._loaded_mtime: Optional[float] = None
+        self._load_lock = asyncio.Lock()
+        self.read_only = False
+        changelog.on_save = self.add
+
+    @staticmethod
+    def _segment(content: MCVersionContent) -> Dict[str, int]:
+        segment: Dict[str, int] = {}
+        for field_name, bit in _SECTION_BITS.items():
+            for item in getattr(content, field_name):
+                for token in tokenize(item):
+                    segment[token] = segment.get(token, 0) | bit
+        return segment
+
+    def _apply(self, version_id: str, segment: Dict[str, int]):
+        previous = self._versions.get(version_id)
+        if previous:
+            for token in previous:
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.pop(version_id, None)
+                    if not postings:
+                        del self._postings[token]
+        self._versions[version_id] = segment
+        self._order.setdefault(version_id, len(self._order))
+        for token, mask in segment.items():
+            self._postings.setdefault(token, {})[version_id] = mask
+
+    def _read_segments(self) -> List[Tuple[str, Dict[str, int]]]:
+        segments = []
+        if not os.path.exists(self.index_file):
+            return segments
+        with open(self.index_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                segments.append((entry["v"], entry["p"]))
+        return segments
+
+    def _append_segments(self, segments: List[Tuple[str, Dict[str, int]]]):
+        with open(self.index_file, "a", encoding="utf-8") as f:
+            for version_id, segment in segments:
+                f.write(json.dumps({"v": version_id, "p": segment}, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+
+    def _compact(self):
+        tmp_path = self.index_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for version_id, segment in self._versions.items():
+                f.write(json.dumps({"v": version_id, "p": segment}, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+        os.replace(tmp_path, self.index_file)
+
+    def _backfill(self, indexed: Set[str]) -> List[Tuple[str, Dict[str, int]]]:
+        skip = {ChangelogStore.file_key(version_id) for version_id in indexed}
+        segments = [
+            (version_id, ChangelogSearchIndex._segment(content))
+            for version_id, content in self._changelog.iter_stored(skip)
+        ]
+        if segments:
+            self._append_segments(segments)
+        return segments
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.index_file)
+        except OSError:
+            return None
+
+    def reset(self):
+        self._postings.clear()
+        self._versions.clear()
+        self._order.clear()
+        self._loaded = False
+
+    async def _ensure_loaded(self):
+        # A read-only instance shares the file with the lease holder, so it
+        # reloads when the holder has appended to it.
+        if self._loaded and not (self.read_only and self._mtime() != self._loaded_mtime):
+            return
+        async with self._load_lock:
+            mtime = self._mtime()
+            if self._loaded and not (self.read_only and mtime != self._loaded_mtime):
+                return
+            self.reset()
+            loop = asyncio.get_running_loop()
+            segments = await loop.run_in_executor(None, self._read_segments)
+            for version_id, segment in segments:
+                self._apply(version_id, segment)
+            if not self.read_only:
+                if len(segments) > 2 * len(self._versions):
+                    await loop.run_in_executor(None, self._compact)
+                backfilled = await loop.run_in_executor(None, self._backfill, set(self._versions))
+                for version_id, segment in backfilled:
+                    self._apply(version_id, segment)
+                if backfilled:
+                    logger.info(f"MCNews: Indexed {len(backfilled)} stored changelogs for search")
+            self._loaded_mtime = mtime
+            self._loaded = True
+
+    async def add(self, version_id: str, content: MCVersionContent):
+        if self.read_only:
+            return
+        segment = ChangelogSearchIndex._segment(content)
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._append_segments, [(version_id, segment)]
+        )
+        if self._loaded:
+            self._apply(version_id, segment)
+
+    async def search(self, query: str, index: Optional[VersionIndex] = None) -> List[Tuple[str, List[str]]]:
+        await self._ensure_loaded()
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        matches: Optional[Dict[str, int]] = None
+        for token in sorted(tokens, key=lambda t: len(self._postings.get(t, ()))):
+            postings = self._postings.get(token, {})
+            if matches is None:
+                matches = dict(postings)
+            else:
+                matches = {v: mask | postings[v] for v, mask in matches.items() if v in postings}
+            if not matches:
+                return []
+
+        def sort_key(version_id: str):
+            entry = index.get(version_id) if index else None
+            return (entry.release_time if entry else "", self._order.get(version_id, 0))
+
+        results = []
+        for version_id in sorted(matches, key=sort_key, reverse=True):
+            mask = matches[version_id]
+            sections = [name for name, field_name in CHANGELOG_SECTIONS.items() if mask & _SECTION_BITS[field_name]]
+            results.append((version_id, sections))
+        return results
+
+    async def snippet(self, version_id: str, query: str) -> Optional[str]:
+        tokens = tokenize(query)
+        content = await self._changelog.load(version_id)
+        if content is None or not tokens:
+            return None
+        for field_name in CHANGELOG_SECTIONS.values():
+            for item in getattr(content, field_name):
+                if tokens <= tokenize(item):
+                    return item
+        return None
@@ -0,0 +1,129 @@
+import json
+import time
+import socket
+import struct
+import asyncio
+from typing import Any, Dict, Tuple
+
+from .constants import SLP_PROTOCOL_VERSION, SLP_MAX_RESPONSE
+
+
+def pack_varint(value: int) -> bytes:
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_varint(data: bytes, pos: int = 0) -> Tuple[int, int]:
+    result = 0
+    for shift in range(0, 35, 7):
+        if pos >= len(data):
+            raise ValueError("Truncated VarInt")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            if result & 0x80000000:
+                result -= 1 << 32
+            return result, pos
+    raise ValueError("VarInt too long")
+
+
+async def read_varint(reader: asyncio.StreamReader) -> int:
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            if result & 0x80000000:
+                result -= 1 << 32
+            return result
+    raise ValueError("VarInt too long")
+
+
+def pack_string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return pack_varint(len(data)) + data
+
+
+def pack_packet(packet_id: int, payload: bytes = b"") -> bytes:
+    body = pack_varint(packet_id) + payload
+    return pack_varint(len(body)) + body
+
+
+async def read_packet(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    length = await read_varint(reader)
+    if length <= 0 or length > SLP_MAX_RESPONSE:
+        raise ValueError(f"Invalid packet length {length}")
+    data = await reader.readexactly(length)
+    packet_id, pos = decode_varint(data)
+    return packet_id, data[pos:]
+
+
+def describe(status: Dict[str, Any]) -> str:
+    version = status.get("version", {}).get("name", "")
+    players = status.get("players", {})
+    parts = [version] if version else []
+    if "online" in players:
+        parts.append(f"{players.get('online', 0)}/{players.get('max', 0)} players")
+    return " · ".join(parts)
+
+
+async def server_list_ping(host: str, port: int) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    start = time.monotonic()
+    infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    resolved = time.monotonic()
+    address = infos[0][4][0]
+
+    reader, writer = await asyncio.open_connection(address, port)
+    connected = time.monotonic()
+    try:
+        handshake = (
+            pack_varint(SLP_PROTOCOL_VERSION)
+            + pack_string(host)
+            + struct.pack(">H", port)
+            + pack_varint(1)
+        )
+        writer.write(pack_packet(0x00, handshake) + pack_packet(0x00))
+        await writer.drain()
+
+        packet_id, payload = await read_packet(reader)
+        first_byte = time.monotonic()
+        if packet_id != 0x00:
+            raise ValueError(f"Unexpected packet 0x{packet_id:02x}")
+        length, pos = decode_varint(payload)
+        status = json.loads(payload[pos:pos + length].decode("utf-8"))
+
+        rtt_ms = None
+        token = int(time.time() * 1000)
+        sent = time.monotonic()
+        writer.write(pack_packet(0x01, struct.pack(">q", token)))
+        await writer.drain()
+        try:
+            packet_id, payload = await read_packet(reader)
+            if packet_id == 0x01 and struct.unpack(">q", payload[:8])[0] == token:
+                rtt_ms = (time.monotonic() - sent) * 1000
+        except (asyncio.IncompleteReadError, ValueError, struct.error):
+            pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    return {
+        "status": status,
+        "dns_ms": (resolved - start) * 1000,
+        "connect_ms": (connected - resolved) * 1000,
+        "ttfb_ms": (first_byte - connected) * 1000,
+        "latency": rtt_ms if rtt_ms is not None else (first_byte - start) * 1000,
+    }
@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+
+from .storage import DataStorage
+from .constants import STORAGE_RECENT_KEEP, SQLITE_HISTORY_DAYS, SQLITE_PRUNE_INTERVAL
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notified_versions (
+    version_id TEXT PRIMARY KEY,
+    notified_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notified_versions_at ON notified_versions(notified_at);
+CREATE TABLE IF NOT EXISTS notified_articles (
+    article_id TEXT PRIMARY KEY,
+    notified_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notified_articles_at ON notified_articles(notified_at);
+CREATE TABLE IF NOT EXISTS service_probes (
+    service TEXT NOT NULL,
+    ts REAL NOT NULL,
+    online INTEGER NOT NULL,
+    latency INTEGER NOT NULL,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_service_probes ON service_probes(service, ts);
+CREATE TABLE IF NOT EXISTS deliveries (
+    notification_id TEXT NOT NULL,
+    session TEXT NOT NULL,
+    ts REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_deliveries ON deliveries(notification_id, session);
+CREATE INDEX IF NOT EXISTS idx_deliveries_ts ON deliveries(ts);
+"""
+
+_LIST_KEYS = ("notified_versions", "notified_articles")
+
+
+class SQLiteStorage(DataStorage):
+
+    def __init__(self, filename: str = "mcnews_data.db", json_filename: str = "mcnews_data.json", read_only: bool = False):
+        self._json_filename = json_filename
+        self._conn: Optional[sqlite3.Connection] = None
+        self._statements: List[Tuple[str, tuple]] = []
+        self._last_prune = 0.0
+        super().__init__(filename, read_only=read_only)
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcnews-sqlite")
+
+    def _initial_data(self) -> Dict[str, Any]:
+        # Opening the database can migrate a large legacy JSON file, so it
+        # waits for open() on the I/O executor instead of the constructor.
+        return self._default_data()
+
+    async def open(self) -> bool:
+        if self._conn is not None:
+            return False
+        await self.reload()
+        return True
+
+    def _load(self) -> Dict[str, Any]:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        data = self._default_data()
+        if self.read_only:
+            # Followers only look at the lease holder's database and must not
+            # create it, add the schema or migrate into it.
+            if not os.path.exists(self.data_file):
+                self._flushed = {}
+                return data
+            self._conn = sqlite3.connect(f"file:{self.data_file}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(self.data_file, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+        rows = self._conn.execute("SELECT key, value FROM kv").fetchall()
+        if rows:
+            for key, value in rows:
+                data[key] = json.loads(value)
+        elif not self.read_only:
+            self._migrate_json(data)
+
+        data["notified_versions"] = self._recent("notified_versions", "version_id")
+        data["notified_articles"] = self._recent("notified_articles", "article_id")
+        self._flushed = {
+            key: self._dumps(value) for key, value in data.items() if key not in _LIST_KEYS
+        }
+        return data
+
+    def _recent(self, table: str, column: str) -> List[str]:
+        rows = self._conn.execute(
+            f"SELECT {column} FROM {table} ORDER BY notified_at DESC LIMIT ?",
+            (STORAGE_RECENT_KEEP,)
+        ).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def _migrate_json(self, data: Dict[str, Any]):
+        json_file = os.path.join(self.data_dir, self._json_filename)
+        if not os.path.exists(json_file):
+            return
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"MCNews: Failed to migrate {json_file}: {e}")
+            return
+        legacy.pop("_generation", None)
+        now = time.time()
+        with self._conn:
+            for key, value in legacy.items():
+                if key in _LIST_KEYS:
+                    column = "version_id" if key == "notified_versions" else "article_id"
+                    self._conn.executemany(
+                        f"INSERT OR IGNORE INTO {key} ({column}, notified_at) VALUES (?, ?)",
+                        [(item, now + i * 1e-6) for i, item in enumerate(value)]
+                    )
+                    continue
+                data[key] = value
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+                    (key, self._dumps(value))
+                )
+        logger.info(f"MCNews: Migrated {json_file} into SQLite storage")
+
+    def _prepare_flush(self):
+        encoded = {
+            key: self._dumps(value) for key, value in self.data.items() if key not in _LIST_KEYS
+        }
+        statements = [
+            ("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, value))
+            for key, value in encoded.items() if self._flushed.get(key) != value
+        ]
+        statements.extend(self._statements)
+        self._statements = []
+
+        now = time.time()
+        if now - self._last_prune >= SQLITE_PRUNE_INTERVAL:
+            self._last_prune = now
+            cutoff = now - SQLITE_HISTORY_DAYS * 86400
+            statements.append(("DELETE FROM service_probes WHERE ts < ?", (cutoff,)))
+            statements.append(("DELETE FROM deliveries WHERE ts < ?", (cutoff,)))
+        return encoded, statements, False
+
+    def _write_payload(self, payload: List[Tuple[str, tuple]], journaled: bool):
+        with self._conn:
+            for sql, params in payload:
+                self._conn.execute(sql, params)
+
+    def _commit_flush(self, encoded: Dict[str, str], payload: List[Tuple[str, tuple]], journaled: bool, dirty_since: float):
+        self._flushed = encoded
+        latency_ms = (time.monotonic() - dirty_since) * 1000
+        self.stats["flushes"] += 1
+        self.stats["bytes_written"] += sum(len(sql) + len(repr(params)) for sql, params in payload)
+        self.stats["last_flush_bytes"] = len(payload)
+        self.stats["last_latency_ms"] = latency_ms
+        self.stats["max_latency_ms"] = max(self.stats["max_latency_ms"], latency_ms)
+
+    def _flush_failed(self, payload: List[Tuple[str, tuple]]):
+        self._flushed = {}
+        self._statements = [
+            item for item in payload if not item[0].startswith("INSERT OR REPLACE INTO kv")
+        ] + self._statements
+
+    def _write_snapshot(self, data: Dict[str, Any]):
+        pass
+
+    def _queue(self, sql: str, params: tuple):
+        if self.read_only:
+            return
+        self._statements.append((sql, params))
+        self.save()
+
+    async def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        if self._conn is None:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._io_executor,
+            lambda: self._conn.execute(sql, params).fetchall()
+        )
+
+    def add_notified_article(self, article_id: str):
+        super().add_notified_article(article_id)
+        self._queue(
+            "INSERT OR IGNORE INTO notified_articles (article_id, notified_at) VALUES (?, ?)",
+            (article_id, time.time())
+        )
+
+    def add_notified_version(self, version_id: str):
+        super().add_notified_version(version_id)
+        self._queue(
+            "INSERT OR IGNORE INTO notified_versions (version_id, notified_at) VALUES (?, ?)",
+            (version_id, time.time())
+        )
+
+    async def is_version_notified(self, version_id: str) -> bool:
+        if version_id in self.data.get("notified_versions", []):
+            return True
+        rows = await self._query(
+            "SELECT 1 FROM notified_versions WHERE version_id = ?", (version_id,)
+        )
+        return bool(rows)
+
+    def record_probe(self, service: str, online: bool, latency: int, error: str = ""):
+        self._queue(
+            "INSERT INTO service_probes (service, ts, online, latency, error) VALUES (?, ?, ?, ?, ?)",
+            (service, time.time(), int(online), int(latency), error or "")
+        )
+
+    def record_delivery(self, notification_id: str, session: str, error: Optional[str] = None):
+        self._queue(
+            "INSERT INTO deliveries (notification_id, session, ts, ok, error) VALUES (?, ?, ?, ?, ?)",
+            (notification_id, session, time.time(), int(error is None), error or "")
+        )
+
+    async def delivery_history(self, notification_id: str) -> List[tuple]:
+        return await self._query(
+            "SELECT session, ts, ok, error FROM deliveries WHERE notification_id = ? ORDER BY ts",
+            (notification_id,)
+        )
+
+    async def close(self):
+        await super().close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._io_executor.shutdown(wait=True)
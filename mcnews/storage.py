@@ -1,37 +1,317 @@
 import os
 import json
-from typing import Dict, List, Any
+import time
+import asyncio
+from typing import Dict, List, Any, Optional, Set
 
+from astrbot.api import logger
 from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
+from .constants import (
+    STORAGE_FLUSH_DELAY,
+    STORAGE_JOURNAL_COMPACT_RATIO,
+    STORAGE_RECENT_KEEP,
+    KNOWN_VERSIONS_KEEP
+)
+
 
 class DataStorage:
     
-    def __init__(self, filename: str = "mcnews_data.json"):
-        self.data_file = os.path.join(get_astrbot_data_path(), filename)
-        self.data = self._load()
+    def __init__(self, filename: str = "mcnews_data.json", journal: bool = False, read_only: bool = False):
+        self.data_dir = get_astrbot_data_path()
+        self.data_file = os.path.join(self.data_dir, filename)
+        self.journal_file = self.data_file + ".journal"
+        self.journal = journal
+        self.flush_delay = STORAGE_FLUSH_DELAY
+        self.stats: Dict[str, float] = {
+            "saves": 0,
+            "flushes": 0,
+            "bytes_written": 0,
+            "last_flush_bytes": 0,
+            "last_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        }
+        self._flushed: Dict[str, str] = {}
+        self._generation = 0
+        self._snapshot_size = 0
+        self._journal_size = 0
+        self._dirty_since: Optional[float] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._io_executor = None
+        self.metrics = None
+        self.read_only = read_only
+        self._known_versions: Optional[Set[str]] = None
+        self.data = self._initial_data()
+
+    def _initial_data(self) -> Dict[str, Any]:
+        return self._load()
+
+    def _default_data(self) -> Dict[str, Any]:
+        return {
+            "last_article_id": "",
+            "last_version_id": "",
+            "last_services_status": {},
+            "notified_articles": [],
+            "notified_versions": [],
+            "known_versions": [],
+            "manifest_cache": {},
+            "service_states": {},
+            "services_snapshot": {},
+            "pending_changes": {},
+            "digest": {}
+        }
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
 
     def _load(self) -> Dict[str, Any]:
         if not os.path.exists(self.data_file):
-            default_data = {
-                "last_article_id": "",
-                "last_version_id": "",
-                "last_services_status": {},
-                "notified_articles": [],
-                "notified_versions": []
-            }
-            self._save_data(default_data)
+            default_data = self._default_data()
+            if self.read_only:
+                self._flushed = {key: self._dumps(value) for key, value in default_data.items()}
+            else:
+                self._write_snapshot(default_data)
             return default_data
 
-        with open(self.data_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        try:
+            with open(self.data_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._snapshot_size = os.path.getsize(self.data_file)
+        except (OSError, ValueError) as e:
+            logger.error(f"MCNews: Failed to load {self.data_file}, starting fresh: {e}")
+            data = self._default_data()
+        self._generation = data.pop("_generation", 0)
+
+        if os.path.exists(self.journal_file):
+            self._replay_journal(data)
+
+        self._flushed = {key: self._dumps(value) for key, value in data.items()}
+        return data
+
+    def _replay_journal(self, data: Dict[str, Any]):
+        good = 0
+        with open(self.journal_file, "rb") as f:
+            lines = iter(f)
+            try:
+                header_line = next(lines, b"")
+                header = json.loads(header_line)
+            except ValueError:
+                header = None
+            if isinstance(header, dict) and header.get("generation") == self._generation and header_line.endswith(b"\n"):
+                good = len(header_line)
+                for line in lines:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    data[entry["k"]] = entry["v"]
+                    good += len(line)
+        size = os.path.getsize(self.journal_file)
+        if good < size and not self.read_only:
+            # A torn last line (or a journal from another generation) would
+            # sit in front of every later append and hide it from replay.
+            logger.warning(f"MCNews: Dropping {size - good} unreadable bytes from {self.journal_file}")
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(good)
+                f.flush()
+                os.fsync(f.fileno())
+        self._journal_size = good
+
+    def _fsync_dir(self):
+        if hasattr(os, "O_DIRECTORY"):
+            fd = os.open(os.path.dirname(self.data_file), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _write_snapshot_payload(self, payload: bytes):
+        tmp_file = self.data_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self._fsync_dir()
+
+    def _append_journal_payload(self, payload: bytes):
+        with open(self.journal_file, "ab") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _snapshot_body(self, encoded: Dict[str, str], generation: int) -> bytes:
+        fields = [self._dumps(key) + ":" + value for key, value in encoded.items()]
+        fields.append(f'"_generation":{generation}')
+        return ("{" + ",".join(fields) + "}").encode("utf-8")
+
+    def _write_snapshot(self, data: Dict[str, Any]):
+        encoded = {key: self._dumps(value) for key, value in data.items()}
+        payload = self._snapshot_body(encoded, self._generation + 1)
+        self._write_snapshot_payload(payload)
+        self._generation += 1
+        self._snapshot_size = len(payload)
+        self._journal_size = 0
+        self._flushed = encoded
+
+    def _prepare_flush(self):
+        encoded = {key: self._dumps(value) for key, value in self.data.items()}
+        if self.journal and self._flushed:
+            changed = [key for key, value in encoded.items() if self._flushed.get(key) != value]
+            journal_size = self._journal_size + sum(len(encoded[key]) for key in changed)
+            if journal_size <= max(self._snapshot_size, 1) * STORAGE_JOURNAL_COMPACT_RATIO:
+                lines = []
+                if changed and self._journal_size == 0:
+                    lines.append(self._dumps({"generation": self._generation}) + "\n")
+                for key in changed:
+                    lines.append('{"k":' + self._dumps(key) + ',"v":' + encoded[key] + '}\n')
+                return encoded, "".join(lines).encode("utf-8"), True
+        return encoded, self._snapshot_body(encoded, self._generation + 1), False
+
+    def _commit_flush(self, encoded: Dict[str, str], payload: bytes, journaled: bool, dirty_since: float):
+        self._flushed = encoded
+        if journaled:
+            self._journal_size += len(payload)
+        else:
+            self._generation += 1
+            self._snapshot_size = len(payload)
+            self._journal_size = 0
+        latency_ms = (time.monotonic() - dirty_since) * 1000
+        self.stats["flushes"] += 1
+        self.stats["bytes_written"] += len(payload)
+        self.stats["last_flush_bytes"] = len(payload)
+        self.stats["last_latency_ms"] = latency_ms
+        self.stats["max_latency_ms"] = max(self.stats["max_latency_ms"], latency_ms)
+
+    def _write_payload(self, payload: bytes, journaled: bool):
+        if journaled:
+            if payload:
+                self._append_journal_payload(payload)
+        else:
+            self._write_snapshot_payload(payload)
+
+    def _flush_failed(self, payload: Any):
+        # Nothing from the failed payload is known to be on disk, so the next
+        # flush rewrites every key as a full snapshot.
+        self._flushed = {}
+
+    def _record_flush(self, start: float, outcome: str):
+        if self.metrics is not None:
+            self.metrics.record(
+                "mcnews_storage_flush",
+                time.perf_counter() - start,
+                outcome,
+                store=os.path.basename(self.data_file)
+            )
+
+    def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._dirty_since is None or self.read_only:
+            return
+        dirty_since = self._dirty_since
+        self._dirty_since = None
+        encoded, payload, journaled = self._prepare_flush()
+        start = time.perf_counter()
+        self._write_payload(payload, journaled)
+        self._record_flush(start, "ok")
+        self._commit_flush(encoded, payload, journaled, dirty_since)
+
+    async def _flush_async(self, reraise: bool = False):
+        self._flush_handle = None
+        if self._dirty_since is None or self.read_only:
+            return
+        dirty_since = self._dirty_since
+        self._dirty_since = None
+        encoded, payload, journaled = self._prepare_flush()
+        start = time.perf_counter()
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._io_executor, self._write_payload, payload, journaled
+            )
+        except Exception as e:
+            self._record_flush(start, "error")
+            logger.error(f"MCNews: Failed to flush {self.data_file}: {e}")
+            self._flush_failed(payload)
+            if self._dirty_since is None:
+                self._dirty_since = dirty_since
+            self._schedule_flush()
+            if reraise:
+                raise
+            return
+        self._record_flush(start, "ok")
+        self._commit_flush(encoded, payload, journaled, dirty_since)
+        if self._dirty_since is not None:
+            self._schedule_flush()
+
+    def _start_flush(self):
+        self._flush_task = asyncio.create_task(self._flush_async())
 
-    def _save_data(self, data: Dict[str, Any]):
-        with open(self.data_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            return
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.add_done_callback(lambda _: self._schedule_flush())
+            return
+        self._flush_handle = asyncio.get_running_loop().call_later(
+            self.flush_delay, self._start_flush
+        )
 
     def save(self):
-        self._save_data(self.data)
+        if self.read_only:
+            return
+        self.stats["saves"] += 1
+        if self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._schedule_flush()
+
+    async def save_now(self):
+        # For callers that must know the data is on disk before they go on,
+        # e.g. an outbox entry before the versions it covers are marked done.
+        self.save()
+        if self.read_only:
+            return
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._flush_task = asyncio.ensure_future(self._flush_async(reraise=True))
+        await self._flush_task
+
+    async def open(self) -> bool:
+        # Returns True when data was only loaded now, not in the constructor.
+        return False
+
+    async def reload(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        self._dirty_since = None
+        self._known_versions = None
+        # Loading on the I/O executor keeps it off any write still using the
+        # same file or connection.
+        loop = asyncio.get_running_loop()
+        self.data = await loop.run_in_executor(self._io_executor, self._load)
+
+    async def close(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        self.flush()
 
     def get_notified_articles(self) -> List[str]:
         return self.data.get("notified_articles", [])
@@ -40,7 +320,7 @@ class DataStorage:
         notified = self.data.get("notified_articles", [])
         if article_id not in notified:
             notified.append(article_id)
-        self.data["notified_articles"] = notified[-100:]
+        self.data["notified_articles"] = notified[-STORAGE_RECENT_KEEP:]
 
     def get_notified_versions(self) -> List[str]:
         return self.data.get("notified_versions", [])
@@ -49,7 +329,37 @@ class DataStorage:
         notified = self.data.get("notified_versions", [])
         if version_id not in notified:
             notified.append(version_id)
-        self.data["notified_versions"] = notified[-100:]
+        self.data["notified_versions"] = notified[-STORAGE_RECENT_KEEP:]
+
+    async def is_version_notified(self, version_id: str) -> bool:
+        return version_id in self.get_notified_versions()
+
+    def record_probe(self, service: str, online: bool, latency: int, error: str = ""):
+        pass
+
+    def record_delivery(self, notification_id: str, session: str, error: Optional[str] = None):
+        pass
+
+    async def delivery_history(self, notification_id: str) -> List[tuple]:
+        return []
+
+    def get_known_versions(self) -> Set[str]:
+        if self._known_versions is None:
+            self._known_versions = set(self.data.get("known_versions", []))
+        return self._known_versions
+
+    def add_known_versions(self, version_ids: List[str]):
+        known = self.data.get("known_versions", [])
+        index = self.get_known_versions()
+        for version_id in version_ids:
+            if version_id not in index:
+                index.add(version_id)
+                known.append(version_id)
+        if len(known) > KNOWN_VERSIONS_KEEP:
+            for version_id in known[:-KNOWN_VERSIONS_KEEP]:
+                index.discard(version_id)
+            known = known[-KNOWN_VERSIONS_KEEP:]
+        self.data["known_versions"] = known
 
     def get_last_notified_version(self) -> str:
         return self.data.get("last_version_id", "")
@@ -62,3 +372,39 @@ class DataStorage:
 
     def set_last_services_status(self, status: Dict[str, str]):
         self.data["last_services_status"] = status
+
+    def get_service_states(self) -> Dict[str, Dict[str, Any]]:
+        return self.data.get("service_states", {})
+
+    def set_service_states(self, states: Dict[str, Dict[str, Any]]):
+        self.data["service_states"] = states
+
+    def get_services_snapshot(self) -> Dict[str, Any]:
+        return self.data.get("services_snapshot", {})
+
+    def set_services_snapshot(self, services: List[Dict[str, Any]], updated: float):
+        self.data["services_snapshot"] = {"updated": updated, "services": services}
+
+    def get_pending_changes(self) -> Dict[str, Any]:
+        return self.data.get("pending_changes", {})
+
+    def set_pending_changes(self, changes: Dict[str, Any]):
+        self.data["pending_changes"] = changes
+
+    def get_digest_state(self) -> Dict[str, Any]:
+        return self.data.get("digest", {})
+
+    def set_digest_state(self, state: Dict[str, Any]):
+        self.data["digest"] = state
+
+    def get_manifest_cache(self) -> Dict[str, Any]:
+        return self.data.get("manifest_cache", {})
+
+    def set_manifest_cache(self, etag: str, last_modified: str, size: int, head: Dict[str, Any]):
+        self.data["manifest_cache"] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "size": size,
+            "head": head,
+            "updated": time.time()
+        }
@@ -0,0 +1,99 @@
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional
+
+from .models import VersionEntry
+from .storage import DataStorage
+
+
+class VersionIndexStore(DataStorage):
+
+    def __init__(self, filename: str = "mcnews_version_index.json"):
+        super().__init__(filename)
+
+    def _default_data(self) -> Dict[str, Any]:
+        return {
+            "etag": "",
+            "last_modified": "",
+            "entries": []
+        }
+
+
+class VersionIndex:
+
+    __slots__ = ("_entries", "_release_times", "_positions", "_by_type")
+
+    def __init__(self, entries: Optional[List[VersionEntry]] = None):
+        entries = sorted(entries or [], key=lambda entry: entry.release_time)
+        self._entries: List[VersionEntry] = entries
+        self._release_times: List[str] = [entry.release_time for entry in entries]
+        self._positions: Dict[str, int] = {entry.id: i for i, entry in enumerate(entries)}
+        self._by_type: Dict[str, array] = {}
+        for i, entry in enumerate(entries):
+            self._by_type.setdefault(entry.type, array("I")).append(i)
+
+    @classmethod
+    def build(cls, manifest: Dict[str, Any]) -> "VersionIndex":
+        return cls([
+            VersionEntry(
+                id=version.get("id", ""),
+                type=version.get("type", ""),
+                url=version.get("url", ""),
+                time=version.get("time", ""),
+                release_time=version.get("releaseTime", ""),
+                sha1=version.get("sha1", "")
+            )
+            for version in manifest.get("versions", [])
+        ])
+
+    @classmethod
+    def load(cls, rows: List[List[str]]) -> "VersionIndex":
+        return cls([VersionEntry(*row) for row in rows])
+
+    def dump(self) -> List[List[str]]:
+        return [
+            [entry.id, entry.type, entry.url, entry.time, entry.release_time, entry.sha1]
+            for entry in self._entries
+        ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, version_id: str) -> bool:
+        return version_id in self._positions
+
+    def types(self) -> List[str]:
+        return list(self._by_type)
+
+    def get(self, version_id: str) -> Optional[VersionEntry]:
+        position = self._positions.get(version_id)
+        return self._entries[position] if position is not None else None
+
+    def since(self, release_time: str) -> List[VersionEntry]:
+        position = bisect_right(self._release_times, release_time)
+        return self._entries[position:][::-1]
+
+    def _neighbor(self, version_id: str, step: int) -> Optional[VersionEntry]:
+        position = self._positions.get(version_id)
+        if position is None:
+            return None
+        positions = self._by_type[self._entries[position].type]
+        rank = bisect_right(positions, position) - 1 + step
+        if 0 <= rank < len(positions):
+            return self._entries[positions[rank]]
+        return None
+
+    def previous(self, version_id: str) -> Optional[VersionEntry]:
+        return self._neighbor(version_id, -1)
+
+    def next(self, version_id: str) -> Optional[VersionEntry]:
+        return self._neighbor(version_id, 1)
+
+    def history(self, version_type: Optional[str] = None, count: int = 10) -> List[VersionEntry]:
+        if version_type is None:
+            positions = range(len(self._entries))
+        else:
+            positions = self._by_type.get(version_type, array("I"))
+        newest = len(positions) - 1
+        oldest = max(len(positions) - count, 0)
+        return [self._entries[positions[i]] for i in range(newest, oldest - 1, -1)]